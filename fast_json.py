@@ -0,0 +1,54 @@
+"""
+Fast JSON helpers
+
+Thin wrappers that use orjson (a C extension) when it is installed and fall
+back to the standard library json module otherwise. Output from either path
+is plain JSON readable by json.loads.
+"""
+
+import json
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(obj: Any, indent: Optional[int] = None) -> bytes:
+    """
+    Serialize obj to UTF-8 encoded JSON bytes.
+
+    Args:
+        obj: Object to serialize
+        indent: None for compact output, or 2 for pretty-printed output
+               (other widths use the standard library encoder)
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None and indent in (None, 2):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass  # e.g. non-str dict keys; let the stdlib encoder decide
+
+    return json.dumps(obj, indent=indent).encode('utf-8')
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """Serialize obj to a JSON string (see dumps_bytes)"""
+    if orjson is not None and indent in (None, 2):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+        except TypeError:
+            pass
+
+    return json.dumps(obj, indent=indent)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Deserialize a JSON document from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -42,7 +42,9 @@ class MultiAgentOrchestrator:
         self.workflow_engine = WorkflowEngine(
             tool_executor=self.tool_executor,
             agent_manager=self.agent_manager,
-            progress_callback=self._on_workflow_progress
+            progress_callback=self._on_workflow_progress,
+            # Parallel steps are opt-in: LLM plans rarely declare every dependency
+            max_parallel_steps=self.config.get("multi_agent_settings", {}).get("max_parallel_steps", 1)
         )
         self.plan_parser = PlanParser()
         self.plan_approval = PlanApprovalUI(output_manager=self.output_manager)
@@ -5,12 +5,61 @@ This module defines the Plan and PlanStep classes used by the workflow engine
 to represent multi-step execution plans with dependencies and progress tracking.
 """
 
-import json
+import functools
+import time
 import uuid
+import weakref
+from collections import Counter, defaultdict, deque
 from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import MISSING, dataclass, field, fields
 from enum import Enum
 from datetime import datetime
 
+import fast_json
+
+def wall_offset_ns() -> int:
+    """Current offset from time.monotonic_ns() to wall-clock ns"""
+    return time.time_ns() - time.monotonic_ns()
+
+
+def monotonic_ns_to_datetime(ns: int, offset_ns: int) -> datetime:
+    """
+    Convert a time.monotonic_ns() reading to a local datetime, using an
+    offset from wall_offset_ns() taken near the reading (the two clocks
+    drift apart across suspends and NTP steps)
+    """
+    return datetime.fromtimestamp((ns + offset_ns) / 1e9)
+
+
+def _with_slots(cls):
+    """
+    Rebuild a dataclass with __slots__ for its fields
+
+    Same effect as dataclass(slots=True), which needs Python 3.10. Slots
+    replace the class attributes holding the defaults, so init=False fields
+    are given theirs before the generated __init__ runs.
+    """
+    names = tuple(f.name for f in fields(cls))
+    late_defaults = tuple(
+        (f.name, f.default) for f in fields(cls)
+        if not f.init and f.default is not MISSING
+    )
+    dataclass_init = cls.__init__
+
+    @functools.wraps(dataclass_init)
+    def __init__(self, *args, **kwargs):
+        for name, value in late_defaults:
+            setattr(self, name, value)
+        dataclass_init(self, *args, **kwargs)
+
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = names
+    namespace["__init__"] = __init__
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
 
 class StepStatus(Enum):
     """Status of a plan step"""
@@ -21,10 +70,15 @@ class StepStatus(Enum):
     SKIPPED = "skipped"
 
 
+@_with_slots
+@dataclass(eq=False, repr=False)
 class PlanStep:
     """
     Represents a single step in a workflow plan.
 
+    Slotted dataclass: steps carry no per-instance __dict__, so large plans
+    stay compact and attribute access goes through fixed slot offsets.
+
     Attributes:
         step_id: Unique identifier for this step
         description: Human-readable description of what this step does
@@ -38,30 +92,103 @@ class PlanStep:
         error: Error message if step failed
         start_time: When execution started
         end_time: When execution completed
+        start_time_ns: time.monotonic_ns() when execution started (the engine
+                       records this; start_time is derived from it on access)
+        end_time_ns: time.monotonic_ns() when execution completed
+        wall_offset_ns: Offset used to date start_time_ns/end_time_ns (see
+                        mark_started)
     """
 
-    def __init__(
-        self,
-        description: str,
-        agent_id: str = "main",
-        tool: Optional[str] = None,
-        arguments: Optional[Dict[str, Any]] = None,
-        dependencies: Optional[List[str]] = None,
-        estimated_time: int = 30,
-        step_id: Optional[str] = None
-    ):
-        self.step_id = step_id or str(uuid.uuid4())[:8]
-        self.description = description
-        self.agent_id = agent_id
-        self.tool = tool
-        self.arguments = arguments or {}
-        self.dependencies = dependencies or []
-        self.estimated_time = estimated_time
-        self.status = StepStatus.PENDING
-        self.result: Optional[Any] = None
-        self.error: Optional[str] = None
-        self.start_time: Optional[datetime] = None
-        self.end_time: Optional[datetime] = None
+    description: str
+    agent_id: str = "main"
+    tool: Optional[str] = None
+    arguments: Optional[Dict[str, Any]] = None
+    dependencies: Optional[List[str]] = None
+    estimated_time: int = 30
+    step_id: Optional[str] = None
+    _status: StepStatus = field(default=StepStatus.PENDING, init=False)
+    _plan: Optional["weakref.ReferenceType[Plan]"] = field(default=None, init=False)
+    result: Optional[Any] = field(default=None, init=False)
+    error: Optional[str] = field(default=None, init=False)
+    start_time_ns: Optional[int] = field(default=None, init=False)
+    end_time_ns: Optional[int] = field(default=None, init=False)
+    wall_offset_ns: Optional[int] = field(default=None, init=False)
+    _start_time: Optional[datetime] = field(default=None, init=False)
+    _end_time: Optional[datetime] = field(default=None, init=False)
+
+    def __post_init__(self):
+        if self.step_id is None:
+            self.step_id = str(uuid.uuid4())[:8]
+        if self.arguments is None:
+            self.arguments = {}
+        if self.dependencies is None:
+            self.dependencies = []
+
+    @property
+    def status(self) -> StepStatus:
+        """Current status of the step"""
+        return self._status
+
+    @status.setter
+    def status(self, value: StepStatus) -> None:
+        was_completed = self._status is StepStatus.COMPLETED
+        self._status = value
+
+        # Keep the owning plan's completed counter in sync
+        if self._plan is not None and was_completed != (value is StepStatus.COMPLETED):
+            plan = self._plan()
+            if plan is not None:
+                plan._completed_count += -1 if was_completed else 1
+
+    @property
+    def start_time(self) -> Optional[datetime]:
+        """When execution started"""
+        if self._start_time is None and self.start_time_ns is not None:
+            self._start_time = monotonic_ns_to_datetime(self.start_time_ns, self.wall_offset_ns)
+        return self._start_time
+
+    @start_time.setter
+    def start_time(self, value: Optional[datetime]) -> None:
+        self._start_time = value
+        self.start_time_ns = None
+
+    @property
+    def end_time(self) -> Optional[datetime]:
+        """When execution completed"""
+        if self._end_time is None and self.end_time_ns is not None:
+            self._end_time = monotonic_ns_to_datetime(self.end_time_ns, self.wall_offset_ns)
+        return self._end_time
+
+    @end_time.setter
+    def end_time(self, value: Optional[datetime]) -> None:
+        self._end_time = value
+        self.end_time_ns = None
+
+    def mark_started(self, offset_ns: Optional[int] = None) -> None:
+        """
+        Record the start of execution on the monotonic clock
+
+        Args:
+            offset_ns: Monotonic-to-wall offset to date this step with; the
+                       engine passes its per-run anchor so step times agree
+                       with its log. Taken now if not given.
+        """
+        self.start_time_ns = time.monotonic_ns()
+        self.wall_offset_ns = wall_offset_ns() if offset_ns is None else offset_ns
+        self._start_time = None
+        self.end_time_ns = None
+        self._end_time = None
+
+    def mark_finished(self) -> float:
+        """
+        Record the end of execution on the monotonic clock
+
+        Returns:
+            Elapsed seconds since mark_started()
+        """
+        self.end_time_ns = time.monotonic_ns()
+        self._end_time = None
+        return (self.end_time_ns - self.start_time_ns) / 1e9
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize step to dictionary"""
@@ -82,13 +209,15 @@ class PlanStep:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'PlanStep':
-        """Deserialize step from dictionary"""
+        """Deserialize step from dictionary (containers are copied, not shared)"""
+        arguments = data.get("arguments")
+        dependencies = data.get("dependencies")
         step = cls(
             description=data["description"],
             agent_id=data.get("agent_id", "main"),
             tool=data.get("tool"),
-            arguments=data.get("arguments"),
-            dependencies=data.get("dependencies"),
+            arguments=dict(arguments) if arguments is not None else None,
+            dependencies=list(dependencies) if dependencies is not None else None,
             estimated_time=data.get("estimated_time", 30),
             step_id=data.get("step_id")
         )
@@ -133,14 +262,43 @@ class Plan:
         self.plan_id = plan_id or str(uuid.uuid4())[:8]
         self.name = name
         self.description = description
+        self._steps_version = 0
+        self._order_cache: Optional[List[PlanStep]] = None
+        self._order_cache_version = -1
         self.steps = steps or []
         self.created_at = datetime.now()
         self.approved = False
         self.metadata = metadata or {}
 
+    @property
+    def steps(self) -> List[PlanStep]:
+        """Steps in the plan"""
+        return self._steps
+
+    @steps.setter
+    def steps(self, steps: List[PlanStep]) -> None:
+        self._steps = steps
+        self._completed_count = 0
+        for step in steps:
+            self._attach(step)
+        self._invalidate()
+
+    def _attach(self, step: PlanStep) -> None:
+        """Link a step back to this plan so status changes update progress"""
+        step._plan = weakref.ref(self)
+        if step.status is StepStatus.COMPLETED:
+            self._completed_count += 1
+
+    def _invalidate(self) -> None:
+        """Drop cached derived data after the step list changes"""
+        self._steps_version += 1
+        self._order_cache = None
+
     def add_step(self, step: PlanStep) -> None:
         """Add a step to the plan"""
-        self.steps.append(step)
+        self._steps.append(step)
+        self._attach(step)
+        self._invalidate()
 
     def get_step(self, step_id: str) -> Optional[PlanStep]:
         """Get a step by ID"""
@@ -155,15 +313,13 @@ class Plan:
 
     def get_progress(self) -> Tuple[int, int]:
         """Get progress as (completed, total) tuple"""
-        completed = sum(1 for step in self.steps if step.status == StepStatus.COMPLETED)
-        return (completed, len(self.steps))
+        return (self._completed_count, len(self._steps))
 
     def get_progress_percentage(self) -> float:
         """Get progress as percentage"""
-        if not self.steps:
+        if not self._steps:
             return 0.0
-        completed, total = self.get_progress()
-        return (completed / total) * 100
+        return (self._completed_count / len(self._steps)) * 100
 
     def validate(self) -> Tuple[bool, List[str]]:
         """
@@ -181,11 +337,16 @@ class Plan:
 
         # Collect all step IDs
         step_ids = {step.step_id for step in self.steps}
+        id_counts = Counter(step.step_id for step in self.steps)
+
+        valid_agents = ["main", "reviewer", "researcher", "implementer", "tester", "optimizer"]
+        valid_tools = ["execute_bash", "execute_python_script", "read_file_tool",
+                       "write_file_tool", "list_files_tool"]
 
         # Validate each step
         for i, step in enumerate(self.steps):
             # Check step ID uniqueness
-            if list(s.step_id for s in self.steps).count(step.step_id) > 1:
+            if id_counts[step.step_id] > 1:
                 errors.append(f"Step {i+1}: Duplicate step ID '{step.step_id}'")
 
             # Validate dependencies exist
@@ -193,70 +354,122 @@ class Plan:
                 if dep not in step_ids:
                     errors.append(f"Step {i+1}: Dependency '{dep}' not found")
 
-            # Check for circular dependencies
-            if self._has_circular_dependency(step.step_id):
-                errors.append(f"Step {i+1}: Circular dependency detected")
-
             # Validate agent_id
-            valid_agents = ["main", "reviewer", "researcher", "implementer", "tester", "optimizer"]
             if step.agent_id not in valid_agents:
                 errors.append(f"Step {i+1}: Invalid agent_id '{step.agent_id}'")
 
             # Validate tool if specified
             if step.tool:
-                valid_tools = ["execute_bash", "execute_python_script", "read_file_tool",
-                              "write_file_tool", "list_files_tool"]
                 if step.tool not in valid_tools:
                     errors.append(f"Step {i+1}: Invalid tool '{step.tool}'")
 
-        return (len(errors) == 0, errors)
-
-    def _has_circular_dependency(self, step_id: str, visited: Optional[set] = None) -> bool:
-        """Check if a step has circular dependencies"""
-        if visited is None:
-            visited = set()
+        # Check for circular dependencies (one error per cycle)
+        for cycle in self._find_dependency_cycles():
+            errors.append(f"Circular dependency detected: {' → '.join(cycle)}")
 
-        if step_id in visited:
-            return True
+        return (len(errors) == 0, errors)
 
-        visited.add(step_id)
-        step = self.get_step(step_id)
+    def _find_dependency_cycles(self) -> List[List[str]]:
+        """
+        Find every dependency cycle in the plan in a single pass.
 
-        if step:
-            for dep in step.dependencies:
-                if self._has_circular_dependency(dep, visited.copy()):
-                    return True
+        Runs an iterative Tarjan strongly-connected-components search over the
+        step dependency graph. Each SCC with more than one step (or a step that
+        depends on itself) is one cycle.
 
-        return False
+        Returns:
+            List of cycles, each a sorted list of step IDs
+        """
+        graph: Dict[str, List[str]] = {}
+        for step in self.steps:
+            graph.setdefault(step.step_id, []).extend(step.dependencies)
+
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack = set()
+        stack: List[str] = []
+        cycles: List[List[str]] = []
+
+        for root in graph:
+            if root in index:
+                continue
+
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph[root]))]
+
+            while work:
+                node, deps = work[-1]
+                for dep in deps:
+                    if dep not in graph:
+                        continue  # Missing dependency, reported separately
+                    if dep not in index:
+                        index[dep] = lowlink[dep] = len(index)
+                        stack.append(dep)
+                        on_stack.add(dep)
+                        work.append((dep, iter(graph[dep])))
+                        break
+                    if dep in on_stack:
+                        lowlink[node] = min(lowlink[node], index[dep])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in graph[node]:
+                            cycles.append(sorted(component))
+
+        return cycles
 
     def get_execution_order(self) -> List[PlanStep]:
         """
         Get steps in execution order, respecting dependencies.
-        Uses topological sort.
+        Uses topological sort (Kahn's algorithm).
+
+        The order is cached until the step list is replaced or extended via
+        add_step(); callers must not mutate the returned list.
         """
+        if self._order_cache is not None and self._order_cache_version == self._steps_version:
+            return self._order_cache
+
         # Build dependency graph
         in_degree = {step.step_id: len(step.dependencies) for step in self.steps}
+        dependents: Dict[str, List[PlanStep]] = defaultdict(list)
+        for step in self.steps:
+            for dep in step.dependencies:
+                dependents[dep].append(step)
 
         # Find steps with no dependencies
-        queue = [step for step in self.steps if len(step.dependencies) == 0]
+        queue = deque(step for step in self.steps if not step.dependencies)
         result = []
 
         while queue:
             # Get next step with all dependencies satisfied
-            current = queue.pop(0)
+            current = queue.popleft()
             result.append(current)
 
             # Update dependent steps
-            for step in self.steps:
-                if current.step_id in step.dependencies:
-                    in_degree[step.step_id] -= 1
-                    if in_degree[step.step_id] == 0:
-                        queue.append(step)
+            for step in dependents.get(current.step_id, ()):
+                in_degree[step.step_id] -= 1
+                if in_degree[step.step_id] == 0:
+                    queue.append(step)
 
         # If we didn't process all steps, there's a circular dependency
         if len(result) != len(self.steps):
             raise ValueError("Circular dependency detected in plan")
 
+        self._order_cache = result
+        self._order_cache_version = self._steps_version
         return result
 
     def estimate_cost(self, model_costs: Optional[Dict[str, float]] = None) -> float:
@@ -301,19 +514,20 @@ class Plan:
 
     def to_json(self, indent: int = 2) -> str:
         """Serialize plan to JSON string"""
-        return json.dumps(self.to_dict(), indent=indent)
+        return fast_json.dumps(self.to_dict(), indent=indent)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Plan':
-        """Deserialize plan from dictionary"""
+        """Deserialize plan from dictionary (containers are copied, not shared)"""
         steps = [PlanStep.from_dict(s) for s in data.get("steps", [])]
+        metadata = data.get("metadata")
 
         plan = cls(
             name=data["name"],
             description=data["description"],
             steps=steps,
             plan_id=data.get("plan_id"),
-            metadata=data.get("metadata")
+            metadata=dict(metadata) if metadata is not None else None
         )
 
         if data.get("created_at"):
@@ -326,7 +540,7 @@ class Plan:
     @classmethod
     def from_json(cls, json_str: str) -> 'Plan':
         """Deserialize plan from JSON string"""
-        data = json.loads(json_str)
+        data = fast_json.loads(json_str)
         return cls.from_dict(data)
 
     def display(self, show_details: bool = True) -> str:
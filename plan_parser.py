@@ -11,6 +11,10 @@ from typing import Optional, List, Tuple, Dict, Any
 from plan import Plan, PlanStep
 
 
+# One time estimate per line: leading text, first number, then the unit text
+_TIME_RE = re.compile(r'^[^\d\n]*(\d*).*$', re.MULTILINE)
+
+
 class PlanParser:
     """Parses workflow plans from agent responses"""
 
@@ -116,14 +120,23 @@ class PlanParser:
 
         # Parse steps
         steps = []
+        timed_steps = []
+        time_texts = []
         step_matches = self.step_pattern.finditer(plan_text)
 
         for step_num, step_match in enumerate(step_matches, 1):
             step_text = step_match.group(0).strip()
-            step = self._parse_step(step_text, step_num)
+            step, time_text = self._parse_step(step_text, step_num)
 
             if step:
                 steps.append(step)
+                if time_text is not None:
+                    timed_steps.append(step)
+                    time_texts.append(time_text)
+
+        # Resolve all estimated times in one batched scan
+        for step, seconds in zip(timed_steps, self.parse_times(time_texts)):
+            step.estimated_time = seconds
 
         if not steps:
             self.logger.warning("No steps found in workflow plan")
@@ -162,8 +175,14 @@ class PlanParser:
 
         return plan
 
-    def _parse_step(self, step_text: str, step_num: int) -> Optional[PlanStep]:
-        """Parse a single step from text"""
+    def _parse_step(self, step_text: str, step_num: int) -> Tuple[Optional[PlanStep], Optional[str]]:
+        """
+        Parse a single step from text
+
+        Returns:
+            Tuple of (step, raw estimated time text or None). The step keeps the
+            default estimated_time; callers resolve time texts via parse_times().
+        """
         lines = step_text.split('\n')
 
         # Extract step description from header
@@ -175,7 +194,7 @@ class PlanParser:
         tool = None
         arguments = {}
         dependencies = []
-        estimated_time = 30
+        time_text = None
 
         for line in lines[1:]:
             line = line.strip()
@@ -204,7 +223,6 @@ class PlanParser:
             # Parse estimated time
             elif line.startswith("- Estimated Time:") or line.startswith("Estimated Time:"):
                 time_text = line.split(":", 1)[1].strip()
-                estimated_time = self._parse_time(time_text)
 
         # Create step
         step = PlanStep(
@@ -212,11 +230,10 @@ class PlanParser:
             agent_id=agent_id,
             tool=tool,
             arguments=arguments,
-            dependencies=dependencies,
-            estimated_time=estimated_time
+            dependencies=dependencies
         )
 
-        return step
+        return step, time_text
 
     def _parse_arguments(self, args_text: str) -> Dict[str, Any]:
         """Parse arguments from text"""
@@ -259,23 +276,42 @@ class PlanParser:
 
     def _parse_time(self, time_text: str) -> int:
         """Parse estimated time to seconds"""
-        time_text = time_text.lower()
-
-        # Extract number
-        number_match = re.search(r'(\d+)', time_text)
-        if not number_match:
-            return 30
-
-        value = int(number_match.group(1))
-
-        # Check unit
-        if 'min' in time_text or 'm' in time_text:
-            return value * 60
-        elif 'hour' in time_text or 'h' in time_text:
-            return value * 3600
-        else:
-            # Assume seconds
-            return value
+        return self.parse_times([time_text])[0]
+
+    def parse_times(self, time_texts: List[str]) -> List[int]:
+        """
+        Parse several estimated times to seconds in one regex scan.
+
+        Args:
+            time_texts: Time strings such as "30s", "5 minutes" or "2h"
+
+        Returns:
+            Seconds for each input, in order (30 when no number is present)
+        """
+        if not time_texts:
+            return []
+
+        buffer = "\n".join(text.replace("\n", " ") for text in time_texts).lower()
+        seconds = []
+
+        for match in _TIME_RE.finditer(buffer):
+            if not match.group(1):
+                seconds.append(30)
+                continue
+
+            value = int(match.group(1))
+            line = match.group(0)
+
+            # Check unit
+            if 'min' in line or 'm' in line:
+                seconds.append(value * 60)
+            elif 'hour' in line or 'h' in line:
+                seconds.append(value * 3600)
+            else:
+                # Assume seconds
+                seconds.append(value)
+
+        return seconds
 
     def _extract_metadata(self, plan_text: str) -> Dict[str, Any]:
         """Extract metadata from plan text"""
@@ -4,17 +4,74 @@ Phase 2 Test Suite - Workflow Engine Testing
 Tests for workflow plans, plan parsing, approval, and execution.
 """
 
+import atexit
+import errno
 import unittest
+from unittest import mock
 import asyncio
+import functools
 import json
+import os
 import tempfile
+import time
+import threading
+from datetime import datetime
 from pathlib import Path
 import shutil
+import subprocess
+import uuid
 
 from plan import Plan, PlanStep, StepStatus
 from plan_parser import PlanParser
+import workflow_engine
 from workflow_engine import WorkflowEngine, WorkflowStatus
+import tool_executor
 from tool_executor import ToolExecutor
+import fast_json
+
+
+# Keep workflow test directories on tmpfs when available so file operations
+# never touch the block layer (Linux CI exposes /dev/shm as a RAM-backed mount)
+RAM_TMPDIR = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+
+# One scratch root per process, removed at interpreter exit; tests get their
+# own subdirectories and skip per-test teardown
+TEST_ROOT = Path(tempfile.mkdtemp(prefix="phase2_", dir=RAM_TMPDIR))
+atexit.register(shutil.rmtree, TEST_ROOT, ignore_errors=True)
+
+
+def make_test_dir(name: str) -> Path:
+    """Create a unique scratch directory for a workflow test under TEST_ROOT"""
+    test_dir = TEST_ROOT / f"{name}_{uuid.uuid4().hex[:6]}"
+    test_dir.mkdir()
+    return test_dir
+
+
+# Executor settings shared by the workflow tests; allowed_directories is
+# attached per test with set_allowed_dirs()
+BASE_CONFIG = {
+    "agent_settings": {
+        "safe_mode": True,
+        "timeout_seconds": 60
+    },
+    "file_operations": {
+        "allow_file_write": True,
+        "allow_file_read": True,
+        "max_file_size_kb": 500
+    }
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _executor_template(frozen_config: str) -> ToolExecutor:
+    return ToolExecutor(json.loads(frozen_config))
+
+
+def shared_executor(config: dict, allowed_dirs: list) -> ToolExecutor:
+    """Return the cached ToolExecutor for config, scoped to allowed_dirs"""
+    executor = _executor_template(json.dumps(config, sort_keys=True))
+    executor.set_allowed_dirs(allowed_dirs)
+    return executor
 
 
 class TestPlanDataStructure(unittest.TestCase):
@@ -36,6 +93,16 @@ class TestPlanDataStructure(unittest.TestCase):
         self.assertEqual(step.status, StepStatus.PENDING)
         self.assertIsNotNone(step.step_id)
 
+    def test_plan_step_slots(self):
+        """Test steps are slotted and still get their non-init defaults"""
+        step = PlanStep("Slotted step")
+
+        self.assertFalse(hasattr(step, "__dict__"))
+        with self.assertRaises(AttributeError):
+            step.not_a_field = 1
+        self.assertIsNone(step.result)
+        self.assertIsNone(step.start_time)
+
     def test_plan_step_serialization(self):
         """Test step to/from dict"""
         step = PlanStep(
@@ -104,6 +171,9 @@ class TestPlanDataStructure(unittest.TestCase):
         self.assertFalse(is_valid)
         self.assertTrue(any("circular" in err.lower() for err in errors))
 
+        # One cycle is reported once, not once per step on it
+        self.assertEqual(sum("circular" in err.lower() for err in errors), 1)
+
     def test_plan_validation_invalid_agent(self):
         """Test detection of invalid agent ID"""
         steps = [
@@ -148,6 +218,11 @@ class TestPlanDataStructure(unittest.TestCase):
         self.assertEqual(execution_order[1].step_id, "step_2")
         self.assertEqual(execution_order[2].step_id, "step_3")
 
+        # Order is memoized until the steps change
+        self.assertIs(plan.get_execution_order(), execution_order)
+        plan.add_step(PlanStep("Step 4", "main", dependencies=["step_3"]))
+        self.assertEqual(len(plan.get_execution_order()), 4)
+
     def test_plan_progress_tracking(self):
         """Test progress calculation"""
         steps = [
@@ -293,17 +368,385 @@ This is a test workflow with multiple steps.
 
     def test_parse_time_units(self):
         """Test parsing different time units"""
-        # Seconds
-        self.assertEqual(self.parser._parse_time("30s"), 30)
-        self.assertEqual(self.parser._parse_time("45 seconds"), 45)
+        cases = [
+            # Seconds
+            ("30s", 30),
+            ("45 seconds", 45),
+            # Minutes
+            ("2m", 120),
+            ("5 minutes", 300),
+            # Hours
+            ("1h", 3600),
+            ("2 hours", 7200),
+        ]
+
+        for time_text, expected in cases:
+            with self.subTest(time_text=time_text):
+                self.assertEqual(self.parser._parse_time(time_text), expected)
+
+    def test_parse_times_batch(self):
+        """Test parsing several time strings in one pass"""
+        self.assertEqual(self.parser.parse_times(["30s", "2m", "1h"]), [30, 120, 3600])
+        self.assertEqual(self.parser.parse_times(["soon", "", "10 min"]), [30, 30, 600])
+        self.assertEqual(self.parser.parse_times([]), [])
 
-        # Minutes
-        self.assertEqual(self.parser._parse_time("2m"), 120)
-        self.assertEqual(self.parser._parse_time("5 minutes"), 300)
 
-        # Hours
-        self.assertEqual(self.parser._parse_time("1h"), 3600)
-        self.assertEqual(self.parser._parse_time("2 hours"), 7200)
+class TestToolExecutor(unittest.IsolatedAsyncioTestCase):
+    """Test ToolExecutor safety checks the workflow engine relies on"""
+
+    def setUp(self):
+        """Set up a sandbox directory with a sibling outside it"""
+        self.test_dir = make_test_dir(self._testMethodName)
+        self.sandbox = self.test_dir / "sandbox"
+        self.sandbox.mkdir()
+        self.tool_executor = shared_executor(BASE_CONFIG, [self.sandbox])
+
+    def test_safe_mode_pipes_and_chaining(self):
+        """Test safe mode only lets pipes into read-only filters through"""
+        allowed = [
+            "ls -la",
+            "cat notes.txt | grep todo",
+            "cat notes.txt |grep todo | wc -l",
+            "ls | sort",
+            "ls | head -n 3",
+            "git log | tail -5",
+        ]
+        rejected = [
+            "cat notes.txt | python3 grep.py",
+            "ls | sh",
+            "ls | grepx",
+            "ls ; pwd",
+            "ls && pwd",
+            "ls || pwd",
+            "ls > out.txt",
+            "ls >> out.txt",
+            "cat < notes.txt",
+            "cat notes.txt | grep a > out.txt",
+            "rm -rf build",
+            "curl example.com",
+            "",
+        ]
+        for command in allowed:
+            with self.subTest(command=command):
+                self.assertEqual(self.tool_executor._validate_bash_command(command), (True, None))
+        for command in rejected:
+            with self.subTest(command=command):
+                is_valid, error = self.tool_executor._validate_bash_command(command)
+                self.assertFalse(is_valid)
+                self.assertTrue(error)
+
+    async def test_exec_vs_shell_selection(self):
+        """Test plain commands are exec'd and anything with shell syntax goes to the shell"""
+        split = self.tool_executor._split_simple_command
+        self.assertEqual(split("ls -la"), ["ls", "-la"])
+        self.assertEqual(split("echo 'two  spaces'"), ["echo", "two  spaces"])
+        for command in ["echo $HOME", "ls *.py", "cat f | grep x", "echo `pwd`",
+                        "ls ~", "echo 'unterminated", "echo a\\ b", "   "]:
+            with self.subTest(command=command):
+                self.assertIsNone(split(command))
+
+        result = await self.tool_executor.execute_bash("echo 'two  spaces'")
+        self.assertEqual(result.stdout, "two  spaces\n")
+        result = await self.tool_executor.execute_bash("echo hi | wc -l")
+        self.assertEqual(result.stdout.strip(), "1")
+
+    def test_prefix_table_containment(self):
+        """Test allowed roots match whole path components and nested roots collapse"""
+        root = self.test_dir
+        for name in ["a", "a-b", "a/c", "ab"]:
+            (root / name).mkdir(parents=True)
+
+        self.assertEqual(
+            tool_executor._prefix_table([root / "a", root / "a-b", root / "a" / "c"]),
+            (f"{root}/a-b/", f"{root}/a/")
+        )
+
+        executor = ToolExecutor(BASE_CONFIG)
+        executor.set_allowed_dirs([root / "a", root / "a" / "c"])
+        self.assertTrue(executor._is_path_allowed(root / "a"))
+        self.assertTrue(executor._is_path_allowed(root / "a" / "x.txt"))
+        self.assertTrue(executor._is_path_allowed(root / "a" / "c" / "x.txt"))
+        self.assertFalse(executor._is_path_allowed(root / "a-b" / "x.txt"))
+        self.assertFalse(executor._is_path_allowed(root / "ab"))
+        self.assertFalse(executor._is_path_allowed(root / "a" / ".." / "ab"))
+
+        executor.set_allowed_dirs([root / "a-b"])
+        self.assertTrue(executor._is_path_allowed(root / "a-b" / "x.txt"))
+        self.assertFalse(executor._is_path_allowed(root / "a" / "x.txt"))
+        self.assertFalse(executor._is_path_allowed(root))
+
+    @unittest.skipUnless(hasattr(os, "killpg"), "needs POSIX process groups")
+    async def test_timeout_kills_process_group(self):
+        """Test a timed-out shell command takes its background children with it"""
+        executor = ToolExecutor({"agent_settings": {"safe_mode": False}})
+        pid_file = self.test_dir / "child.pid"
+
+        result = await executor.execute_bash(f"sleep 30 & echo $! > {pid_file}; wait", timeout=1)
+        self.assertFalse(result.success)
+        self.assertIn("timed out", result.error_message)
+
+        child = int(pid_file.read_text())
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and _process_alive(child):
+            await asyncio.sleep(0.05)
+        self.assertFalse(_process_alive(child))
+
+    async def test_read_cache_invalidated_by_write(self):
+        """Test a same-size overwrite is seen by the next read despite the cache"""
+        test_file = self.sandbox / "cached.txt"
+        test_file.write_text("first")
+
+        self.assertEqual((await self.tool_executor.read_file(test_file)).stdout, "first")
+        hits = self.tool_executor.read_cache_hits
+        self.assertEqual((await self.tool_executor.read_file(test_file)).stdout, "first")
+        self.assertEqual(self.tool_executor.read_cache_hits, hits + 1)
+
+        result = await self.tool_executor.write_file(test_file, "again", overwrite=True)
+        self.assertTrue(result.success)
+        self.assertEqual((await self.tool_executor.read_file(test_file)).stdout, "again")
+
+    async def test_write_refuses_existing_file_off_loop(self):
+        """Test write_file refuses to replace a file without overwrite, checking in a worker thread"""
+        test_file = self.sandbox / "existing.txt"
+        test_file.write_text("keep")
+        loop_thread = threading.get_ident()
+        checked_in = []
+        real_exists = Path.exists
+
+        def exists(path, *args, **kwargs):
+            if path.name == test_file.name:
+                checked_in.append(threading.get_ident())
+            return real_exists(path, *args, **kwargs)
+
+        with mock.patch.object(Path, "exists", exists):
+            result = await self.tool_executor.write_file(test_file, "replace")
+
+        self.assertFalse(result.success)
+        self.assertIn("already exists", result.error_message)
+        self.assertEqual(test_file.read_text(), "keep")
+        self.assertTrue(checked_in)
+        self.assertNotIn(loop_thread, checked_in)
+
+    async def test_get_cache_stats(self):
+        """Test get_cache_stats reports read and validation cache counters"""
+        test_file = self.sandbox / "stats.txt"
+        test_file.write_text("data")
+        before = self.tool_executor.get_cache_stats()
+
+        await self.tool_executor.read_file(test_file)
+        await self.tool_executor.read_file(test_file)
+        self.tool_executor._validate_bash_command(f"ls {test_file}")
+        self.tool_executor._validate_bash_command(f"ls {test_file}")
+        stats = self.tool_executor.get_cache_stats()
+
+        self.assertEqual(set(stats), {"read_cache", "validation_cache"})
+        for name in stats:
+            self.assertEqual(set(stats[name]), {"hits", "misses", "entries", "max_entries"})
+            self.assertEqual(stats[name]["hits"], before[name]["hits"] + 1)
+            self.assertEqual(stats[name]["misses"], before[name]["misses"] + 1)
+            self.assertLessEqual(stats[name]["entries"], stats[name]["max_entries"])
+        self.assertGreaterEqual(stats["read_cache"]["entries"], 1)
+        self.assertEqual(stats["validation_cache"]["max_entries"], 256)
+
+    def test_cached_rejection_keeps_error_message(self):
+        """Test a rejection served from the validation cache has the same error"""
+        command = f"nc -l {uuid.uuid4().hex}"
+        first = self.tool_executor._validate_bash_command(command)
+        hits = self.tool_executor.get_cache_stats()["validation_cache"]["hits"]
+        second = self.tool_executor._validate_bash_command(command)
+
+        self.assertEqual(first, (False, "Command 'nc' not in safe command whitelist"))
+        self.assertEqual(second, first)
+        self.assertEqual(self.tool_executor.get_cache_stats()["validation_cache"]["hits"], hits + 1)
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symlinks")
+    async def test_symlink_swap_rechecked(self):
+        """Test a symlink re-pointed outside the sandbox is refused on the next read"""
+        inside = self.sandbox / "inside.txt"
+        inside.write_text("inside")
+        outside = self.test_dir / "outside.txt"
+        outside.write_text("secret")
+
+        link = self.sandbox / "link.txt"
+        link.symlink_to(inside)
+        result = await self.tool_executor.read_file(link)
+        self.assertTrue(result.success)
+        self.assertEqual(result.stdout, "inside")
+
+        link.unlink()
+        link.symlink_to(outside)
+
+        result = await self.tool_executor.read_file(link)
+        self.assertFalse(result.success)
+
+        fresh = ToolExecutor({**BASE_CONFIG, "file_operations": {
+            **BASE_CONFIG["file_operations"], "allowed_directories": [str(self.sandbox)]
+        }})
+        self.assertFalse((await fresh.read_file(link)).success)
+
+
+def _process_alive(pid: int) -> bool:
+    """True if pid exists and is not a zombie"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def pool_config(allowed_dir: Path) -> dict:
+    """Executor settings with a one-worker Python pool rooted at allowed_dir"""
+    return {
+        "agent_settings": {**BASE_CONFIG["agent_settings"], "python_worker_pool_size": 1},
+        "file_operations": {
+            **BASE_CONFIG["file_operations"], "allowed_directories": [str(allowed_dir)]
+        }
+    }
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "worker pool needs os.fork")
+class TestPythonWorkerPool(unittest.IsolatedAsyncioTestCase):
+    """Test execute_python_script through the warm worker pool"""
+
+    def setUp(self):
+        """Set up a fresh pooled executor"""
+        self.test_dir = make_test_dir(self._testMethodName)
+        self.tool_executor = ToolExecutor(pool_config(self.test_dir))
+
+    async def asyncTearDown(self):
+        """Reap the pool's workers before the test's event loop closes"""
+        await self.tool_executor._python_pool.aclose()
+
+    def script(self, name: str, source: str) -> Path:
+        path = self.test_dir / name
+        path.write_text(source)
+        return path
+
+    async def test_exit_code_and_output(self):
+        """Test stdout, stderr and a non-zero exit code come back from the worker"""
+        script = self.script("exit3.py", (
+            "import sys\n"
+            "print('out')\n"
+            "print('err', file=sys.stderr)\n"
+            "sys.exit(3)\n"
+        ))
+
+        result = await self.tool_executor.execute_python_script(script)
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.return_code, 3)
+        self.assertEqual(result.stdout, "out\n")
+        self.assertEqual(result.stderr, "err\n")
+
+    async def test_argv_with_spaces(self):
+        """Test arguments reach the script verbatim"""
+        script = self.script("argv.py", "import json, sys\nprint(json.dumps(sys.argv[1:]))\n")
+        args = ["two words", "", "a'quote\"", "--flag=x y"]
+
+        result = await self.tool_executor.execute_python_script(script, args)
+
+        self.assertTrue(result.success)
+        self.assertEqual(json.loads(result.stdout), args)
+
+    async def test_timeout_replaces_worker(self):
+        """Test a timed-out script kills its worker and the next call gets a new one"""
+        slow = self.script("slow.py", "import time\ntime.sleep(30)\n")
+        fast = self.script("fast.py", "print('ok')\n")
+        pool = self.tool_executor._python_pool
+
+        result = await self.tool_executor.execute_python_script(slow, timeout=1)
+        self.assertFalse(result.success)
+        self.assertIn("timed out", result.error_message)
+        self.assertEqual(pool._workers, [])
+
+        result = await self.tool_executor.execute_python_script(fast)
+        self.assertTrue(result.success)
+        self.assertEqual(result.stdout, "ok\n")
+        self.assertEqual(len(pool._workers), 1)
+
+    async def test_waiter_gets_replacement_after_timeout(self):
+        """Test a caller queued for the only worker is served after that worker is killed"""
+        slow = self.script("slow.py", "import time\ntime.sleep(30)\n")
+        fast = self.script("fast.py", "print('ok')\n")
+        self.tool_executor.max_concurrent_subprocesses = 4  # more slots than workers
+
+        async def run_fast():
+            await asyncio.sleep(0.3)  # let the slow script take the worker first
+            return await self.tool_executor.execute_python_script(fast, timeout=5)
+
+        slow_result, fast_result = await asyncio.wait_for(asyncio.gather(
+            self.tool_executor.execute_python_script(slow, timeout=1),
+            run_fast()
+        ), 15)
+
+        self.assertIn("timed out", slow_result.error_message)
+        self.assertTrue(fast_result.success)
+        self.assertEqual(fast_result.stdout, "ok\n")
+
+    async def test_dead_worker_does_not_rerun_script(self):
+        """Test a worker dying after the job was sent is reported, not re-run"""
+        marker = self.test_dir / "runs.txt"
+        # Kills the pool worker that forked it; never its caller (argv[1])
+        script = self.script("kill_worker.py", (
+            "import os, signal, sys\n"
+            f"open({str(marker)!r}, 'a').write('run\\n')\n"
+            "if os.getppid() != int(sys.argv[1]):\n"
+            "    os.kill(os.getppid(), signal.SIGKILL)\n"
+        ))
+
+        result = await self.tool_executor.execute_python_script(script, [str(os.getpid())])
+
+        self.assertFalse(result.success)
+        self.assertIn("Python worker failed", result.error_message)
+        self.assertEqual(marker.read_text(), "run\n")
+
+
+class TestToolExecutorLoops(unittest.TestCase):
+    """Test one ToolExecutor used from successive event loops"""
+
+    def run_in_fresh_loops(self, make_coro, loops: int = 2):
+        """Run make_coro() to completion in each of several new event loops"""
+        results = []
+        for _ in range(loops):
+            loop = asyncio.new_event_loop()
+            try:
+                results.append(loop.run_until_complete(asyncio.wait_for(make_coro(), 30)))
+            finally:
+                loop.close()
+        return results
+
+    def test_subprocess_limit_across_loops(self):
+        """Test the subprocess limiter does not hang in a second event loop"""
+        executor = ToolExecutor({"agent_settings": {
+            "safe_mode": True, "max_concurrent_subprocesses": 1
+        }})
+
+        async def burst():
+            results = await asyncio.gather(*(executor.execute_bash("echo hi") for _ in range(3)))
+            return [result.success for result in results]
+
+        self.assertEqual(self.run_in_fresh_loops(burst), [[True] * 3] * 2)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "worker pool needs os.fork")
+    def test_worker_pool_across_loops(self):
+        """Test the worker pool restarts its workers for a new event loop"""
+        test_dir = make_test_dir(self._testMethodName)
+        script = test_dir / "hello.py"
+        script.write_text("print('hello')\n")
+        executor = ToolExecutor(pool_config(test_dir))
+
+        async def run():
+            try:
+                result = await executor.execute_python_script(script)
+                return (result.success, result.stdout)
+            finally:
+                await executor._python_pool.aclose()
+
+        self.assertEqual(self.run_in_fresh_loops(run), [(True, "hello\n")] * 2)
 
 
 class TestWorkflowEngine(unittest.IsolatedAsyncioTestCase):
@@ -312,33 +755,14 @@ class TestWorkflowEngine(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         """Set up test environment"""
         # Create temp directory
-        self.test_dir = Path(tempfile.mkdtemp())
-
-        # Create test config
-        self.config = {
-            "agent_settings": {
-                "safe_mode": True,
-                "timeout_seconds": 60
-            },
-            "file_operations": {
-                "allow_file_write": True,
-                "allow_file_read": True,
-                "allowed_directories": [str(self.test_dir)],
-                "max_file_size_kb": 500
-            }
-        }
+        self.test_dir = make_test_dir(self._testMethodName)
 
-        self.tool_executor = ToolExecutor(self.config)
+        self.tool_executor = shared_executor(BASE_CONFIG, [self.test_dir])
         self.engine = WorkflowEngine(
             tool_executor=self.tool_executor,
             checkpoint_dir=self.test_dir / "checkpoints"
         )
 
-    def tearDown(self):
-        """Clean up test environment"""
-        if self.test_dir.exists():
-            shutil.rmtree(self.test_dir)
-
     async def test_execute_simple_plan(self):
         """Test executing a simple 1-step plan"""
         test_file = self.test_dir / "simple_test.txt"
@@ -389,6 +813,73 @@ class TestWorkflowEngine(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(step1.status, StepStatus.COMPLETED)
         self.assertEqual(step2.status, StepStatus.COMPLETED)
 
+    async def test_parallel_fan_out(self):
+        """Test independent steps run concurrently and a join step waits for all"""
+        self.engine.max_parallel_steps = 4
+        writes = []
+        for i in range(3):
+            step = PlanStep(
+                f"Write file {i}",
+                "main",
+                "write_file_tool",
+                {"path": str(self.test_dir / f"fan_{i}.txt"), "content": str(i)}
+            )
+            step.step_id = f"write_{i}"
+            writes.append(step)
+
+        join = PlanStep(
+            "List files",
+            "main",
+            "list_files_tool",
+            {"path": str(self.test_dir), "pattern": "fan_*.txt"},
+            dependencies=[step.step_id for step in writes]
+        )
+
+        plan = Plan("Fan-Out Plan", "Write three files, then list", writes + [join])
+        plan.approved = True
+
+        success, message = await self.engine.execute_plan(plan)
+
+        self.assertTrue(success)
+        self.assertEqual(len(json.loads(join.result)), 3)
+        for step in writes:
+            self.assertLessEqual(step.end_time, join.start_time)
+
+    async def test_two_plans_same_id(self):
+        """Test a second plan sharing a plan_id runs its own steps"""
+        paths = [self.test_dir / "plan_a.txt", self.test_dir / "plan_b.txt"]
+        plans = []
+        for path in paths:
+            step = PlanStep("Write file", "main", "write_file_tool",
+                            {"path": str(path), "content": path.stem})
+            plan = Plan("Same Id", "Test", [step], plan_id="same")
+            plan.approved = True
+            plans.append(plan)
+
+        for plan in plans:
+            success, message = await self.engine.execute_plan(plan)
+            self.assertTrue(success)
+            self.assertEqual(plan.steps[0].status, StepStatus.COMPLETED)
+
+        for path in paths:
+            self.assertEqual(path.read_text(), path.stem)
+
+    async def test_sequential_by_default(self):
+        """Test steps without declared dependencies still run one at a time by default"""
+        steps = [
+            PlanStep(f"Write file {i}", "main", "write_file_tool",
+                     {"path": str(self.test_dir / f"seq_{i}.txt"), "content": str(i)})
+            for i in range(3)
+        ]
+        plan = Plan("Sequential Plan", "No dependencies declared", steps)
+        plan.approved = True
+
+        success, message = await self.engine.execute_plan(plan)
+
+        self.assertTrue(success)
+        for earlier, later in zip(steps, steps[1:]):
+            self.assertLessEqual(earlier.end_time_ns, later.start_time_ns)
+
     async def test_checkpoint_creation(self):
         """Test that checkpoints are created"""
         test_file = self.test_dir / "checkpoint_test.txt"
@@ -409,6 +900,293 @@ class TestWorkflowEngine(unittest.IsolatedAsyncioTestCase):
         # Check that checkpoint was created
         self.assertGreater(len(self.engine.checkpoints), 0)
 
+    async def test_checkpoint_rollback_restores_file(self):
+        """Test that rolling back restores the checkpointed file contents"""
+        test_file = self.test_dir / "rollback_test.txt"
+        test_file.write_text("Original content")
+
+        step = PlanStep(
+            "Overwrite file",
+            "main",
+            "write_file_tool",
+            {"path": str(test_file), "content": "New content"}
+        )
+
+        self.engine._create_checkpoint(step)
+        test_file.write_text("Changed by the step")
+        await self.engine._rollback_all()
+
+        self.assertEqual(test_file.read_text(), "Original content")
+        self.assertEqual(self.engine.status, WorkflowStatus.ROLLED_BACK)
+
+    async def test_reverse_delta_rollback(self):
+        """Test that a compacted (reverse delta) checkpoint restores the file"""
+        test_file = self.test_dir / "delta_test.txt"
+        original = "".join(f"line {i}\n" for i in range(1000))
+        test_file.write_text(original)
+
+        step = PlanStep(
+            "Edit file",
+            "main",
+            "write_file_tool",
+            {"path": str(test_file), "content": ""}
+        )
+
+        checkpoint = self.engine._create_checkpoint(step)
+        test_file.write_text(original.replace("line 10\n", "edited\n"))
+        self.engine._compact_checkpoint(checkpoint)
+
+        self.assertIsNotNone(checkpoint.reverse_delta)
+        self.assertLess(len(checkpoint.reverse_delta), len(original))
+
+        await self.engine._rollback_all()
+        self.assertEqual(test_file.read_text(), original)
+
+    async def test_rollback_failure_does_not_stop_other_files(self):
+        """Test one file failing to restore is reported and the others still roll back"""
+        files = [self.test_dir / f"multi_{i}.txt" for i in range(3)]
+        for i, path in enumerate(files):
+            path.write_text(f"original {i}")
+            self.engine._create_checkpoint(PlanStep(
+                f"Overwrite {path.name}", "main", "write_file_tool",
+                {"path": str(path), "content": ""}
+            ))
+            path.write_text(f"changed {i}")
+
+        broken = files[1]
+        real_write_replace = workflow_engine._write_replace
+
+        def write_replace(path, data, file_stat):
+            if Path(path) == broken:
+                raise OSError(errno.EIO, "simulated restore failure")
+            real_write_replace(path, data, file_stat)
+
+        with mock.patch.object(workflow_engine, "_write_replace", side_effect=write_replace):
+            failed = await self.engine._rollback_all()
+
+        self.assertEqual(failed, [str(broken)])
+        self.assertEqual(files[0].read_text(), "original 0")
+        self.assertEqual(broken.read_text(), "changed 1")
+        self.assertEqual(files[2].read_text(), "original 2")
+        self.assertEqual(self.engine.status, WorkflowStatus.FAILED)
+        self.assertEqual(self.engine.execution_log[-1]["status"], "rollback_failed")
+
+    async def test_write_waits_for_barrier(self):
+        """Test that write_file does not touch the file until its barrier completes"""
+        test_file = self.test_dir / "barrier_test.txt"
+        seen = []
+
+        async def backup():
+            await asyncio.sleep(0.01)
+            seen.append(test_file.exists())
+
+        result = await self.tool_executor.write_file(test_file, "data", barrier=backup())
+
+        self.assertTrue(result.success)
+        self.assertEqual(seen, [False])
+        self.assertEqual(test_file.read_text(), "data")
+
+    async def test_bad_tool_arguments_fail_step(self):
+        """Test that arguments which can't be bound fail the step, not the run"""
+        step = PlanStep("Read nothing", "main", "read_file_tool", {"path": None})
+        plan = Plan("Bad Args", "Test", [step])
+        plan.approved = True
+
+        success, message = await self.engine.execute_plan(plan, auto_rollback=False)
+
+        self.assertFalse(success)
+        self.assertEqual(step.status, StepStatus.FAILED)
+
+    async def test_reverse_delta_full_rewrite_bounded(self):
+        """Test compacting a full rewrite of a large file stays fast and restorable"""
+        test_file = self.test_dir / "rewrite_test.txt"
+        original = "".join(f"old line {i} {uuid.uuid4().hex}\n" for i in range(30000))
+        test_file.write_text(original)
+
+        step = PlanStep(
+            "Rewrite file",
+            "main",
+            "write_file_tool",
+            {"path": str(test_file), "content": ""}
+        )
+
+        checkpoint = self.engine._create_checkpoint(step)
+        test_file.write_text("".join(
+            f"new line {i} {uuid.uuid4().hex}\n" if i % 3 == 0 else line
+            for i, line in enumerate(original.splitlines(keepends=True))
+        ))
+
+        started = time.monotonic()
+        self.engine._compact_checkpoint(checkpoint)
+        self.assertLess(time.monotonic() - started, 5.0)
+
+        await self.engine._rollback_all()
+        self.assertEqual(test_file.read_text(), original)
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "needs /proc/self/fd")
+    async def test_deferred_backup_sync_holds_no_fds(self):
+        """Test an on-disk backup queued for fsync keeps no descriptor open"""
+        test_file = self.test_dir / "large_test.bin"
+        test_file.write_bytes(os.urandom(2 << 20))
+
+        step = PlanStep(
+            "Overwrite file",
+            "main",
+            "write_file_tool",
+            {"path": str(test_file), "content": "small"}
+        )
+
+        open_fds = len(os.listdir("/proc/self/fd"))
+        checkpoint = self.engine._create_checkpoint(step)
+
+        self.assertIn("backup_path", checkpoint.state_snapshot)
+        self.assertEqual(len(os.listdir("/proc/self/fd")), open_fds)
+        self.engine._sync_checkpoints()
+        self.assertEqual(self.engine._pending_fsync, [])
+
+    async def test_loaded_state_is_independent(self):
+        """Test mutating a loaded engine does not leak into later loads"""
+        step = PlanStep("Run", "main", "execute_bash", {"command": "true", "flags": ["-x"]})
+        step.result = {"lines": ["ok"]}
+        self.engine.current_plan = Plan("State Test", "Test", [step])
+        state_file = self.test_dir / "state.json"
+        self.engine.save_state(state_file)
+
+        first = WorkflowEngine.load_state(state_file, self.tool_executor)
+        loaded = first.current_plan.steps[0]
+        loaded.arguments["flags"].append("-y")
+        loaded.result["lines"].append("changed")
+
+        second = WorkflowEngine.load_state(state_file, self.tool_executor).current_plan.steps[0]
+        self.assertEqual(second.arguments["flags"], ["-x"])
+        self.assertEqual(second.result, {"lines": ["ok"]})
+
+    def test_save_state_file_mode(self):
+        """Test save_state honours the umask, keeps an existing mode and follows symlinks"""
+        self.engine.current_plan = Plan("Mode Test", "Test", [PlanStep("Step", "main")])
+        new_file = self.test_dir / "new_state.json"
+
+        old_umask = os.umask(0o022)
+        try:
+            self.engine.save_state(new_file)
+        finally:
+            os.umask(old_umask)
+        self.assertEqual(new_file.stat().st_mode & 0o777, 0o644)
+
+        new_file.chmod(0o640)
+        self.engine.save_state(new_file)
+        self.assertEqual(new_file.stat().st_mode & 0o777, 0o640)
+
+        if hasattr(os, "symlink"):
+            link = self.test_dir / "state_link.json"
+            link.symlink_to(new_file)
+            self.engine.save_state(link)
+            self.assertTrue(link.is_symlink())
+            self.assertEqual(json.loads(new_file.read_text())["plan"]["name"], "Mode Test")
+
+    @unittest.skipUnless(
+        workflow_engine.fcntl is not None and hasattr(os, "copy_file_range"),
+        "needs fcntl and os.copy_file_range"
+    )
+    def test_short_kernel_copy_falls_back(self):
+        """Test a copy_file_range that copies nothing does not leave an empty backup"""
+        src = self.test_dir / "src.bin"
+        dst = self.test_dir / "dst.bin"
+        data = os.urandom(1 << 16)
+        src.write_bytes(data)
+
+        no_reflink = OSError(errno.EOPNOTSUPP, "no reflink")
+        with mock.patch.object(workflow_engine.fcntl, "ioctl", side_effect=no_reflink), \
+                mock.patch.object(workflow_engine.os, "copy_file_range", return_value=0):
+            workflow_engine._fast_copy(src, dst)
+
+        self.assertEqual(dst.read_bytes(), data)
+
+    def test_identical_backups_share_one_object(self):
+        """Test two on-disk checkpoints of identical content store and copy it once"""
+        data = os.urandom(2 << 20)
+        files = [self.test_dir / "copy_a.bin", self.test_dir / "copy_b.bin"]
+        for path in files:
+            path.write_bytes(data)
+
+        with mock.patch.object(workflow_engine, "_fast_copy", wraps=workflow_engine._fast_copy) as copy:
+            checkpoints = [
+                self.engine._create_checkpoint(PlanStep(
+                    "Overwrite file", "main", "write_file_tool",
+                    {"path": str(path), "content": "small"}
+                ))
+                for path in files
+            ]
+
+        self.assertEqual(copy.call_count, 1)
+        hashes = {cp.state_snapshot["content_hash"] for cp in checkpoints}
+        self.assertEqual(len(hashes), 1)
+        backups = [Path(cp.state_snapshot["backup_path"]) for cp in checkpoints]
+        self.assertEqual(backups[0].stat().st_ino, backups[1].stat().st_ino)
+        self.assertEqual(backups[1].read_bytes(), data)
+
+    def flaky_tool(self, failures: int):
+        """Register a stub tool that fails `failures` times, then succeeds"""
+        calls = []
+
+        async def run():
+            calls.append(len(calls))
+            if len(calls) <= failures:
+                return (False, None, f"transient failure {len(calls)}")
+            return (True, "done", "")
+
+        self.engine._tool_dispatch["flaky_tool"] = lambda args: run
+        return calls
+
+    async def run_with_recorded_backoff(self, step: PlanStep, max_retries: int):
+        """Run one step, recording backoff delays instead of sleeping them"""
+        delays = []
+
+        async def fake_sleep(delay, *args, **kwargs):
+            delays.append(delay)
+
+        with mock.patch.object(workflow_engine.asyncio, "sleep", new=fake_sleep):
+            succeeded = await self.engine._execute_step(step, max_retries=max_retries)
+        return succeeded, delays
+
+    async def test_retry_until_success(self):
+        """Test a step failing twice succeeds on its third attempt with exponential backoff"""
+        calls = self.flaky_tool(failures=2)
+        step = PlanStep("Flaky", "main", "flaky_tool")
+
+        succeeded, delays = await self.run_with_recorded_backoff(step, max_retries=2)
+
+        self.assertTrue(succeeded)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(delays, [0.1, 0.2])
+        self.assertEqual(step.status, StepStatus.COMPLETED)
+        self.assertEqual(step.result, "done")
+
+    async def test_retries_exhausted(self):
+        """Test a step failing every attempt stops after max_retries retries"""
+        calls = self.flaky_tool(failures=10)
+        step = PlanStep("Flaky", "main", "flaky_tool")
+
+        succeeded, delays = await self.run_with_recorded_backoff(step, max_retries=3)
+
+        self.assertFalse(succeeded)
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(delays, [0.1, 0.2, 0.4])
+        self.assertEqual(step.status, StepStatus.FAILED)
+        self.assertEqual(step.error, "transient failure 4")
+
+    async def test_non_retryable_failures_not_retried(self):
+        """Test unknown tools and unusable arguments fail on the first attempt"""
+        for step in [
+            PlanStep("Unknown", "main", "no_such_tool"),
+            PlanStep("Bad args", "main", "read_file_tool", {"path": None}),
+        ]:
+            with self.subTest(tool=step.tool):
+                succeeded, delays = await self.run_with_recorded_backoff(step, max_retries=2)
+                self.assertFalse(succeeded)
+                self.assertEqual(delays, [])
+                self.assertEqual(step.status, StepStatus.FAILED)
+
     async def test_unapproved_plan_rejection(self):
         """Test that unapproved plans are rejected"""
         step = PlanStep("Test", "main")
@@ -446,29 +1224,194 @@ class TestWorkflowEngine(unittest.IsolatedAsyncioTestCase):
         self.assertIn("steps_completed", summary)
         self.assertIn("total_execution_time", summary)
 
+    async def test_step_times_share_log_anchor(self):
+        """Test step datetimes use the run's clock anchor, like the log"""
+        reset_clock = self.engine._reset_clock
+
+        def skewed_reset_clock():
+            # Stand-in for the wall clock stepping (NTP, suspend) before the run
+            reset_clock()
+            self.engine._t0_wall_ns += 86400 * 10**9
+
+        self.engine._reset_clock = skewed_reset_clock
+
+        step = PlanStep("Test step", "main")
+        plan = Plan("Anchor Test", "Test", [step])
+        plan.approved = True
+        await self.engine.execute_plan(plan)
+
+        started = next(
+            entry for entry in self.engine.get_execution_log()
+            if entry["step_id"] == step.step_id and entry["status"] == "in_progress"
+        )
+        logged = datetime.fromisoformat(started["timestamp"])
+        self.assertLess(abs((logged - step.start_time).total_seconds()), 1.0)
+
+    async def test_progress_batched(self):
+        """Test progress events are coalesced and all delivered by plan end"""
+        batches = []
+        engine = WorkflowEngine(
+            tool_executor=self.tool_executor,
+            checkpoint_dir=self.test_dir / "checkpoints",
+            progress_callback_batch=batches.append
+        )
+
+        steps = [PlanStep(f"Step {i}", "main") for i in range(3)]
+        plan = Plan("Batch Test", "Test", steps)
+        plan.approved = True
+
+        await engine.execute_plan(plan)
+
+        events = [event for batch in batches for event in batch]
+        self.assertLess(len(batches), len(events))
+        completed = {step_id for step_id, status, _ in events if status == "completed"}
+        self.assertTrue({step.step_id for step in steps} <= completed)
+
+    async def test_execution_log_iteration(self):
+        """Test the log iterator matches the list getter and is reset per run"""
+        step = PlanStep("Test step", "main")
+        plan = Plan("Log Test", "Test", [step])
+        plan.approved = True
+
+        await self.engine.execute_plan(plan)
+        first_run = self.engine.get_execution_log()
+
+        self.assertEqual(list(self.engine.iter_execution_log()), first_run)
+        self.assertIn("timestamp", first_run[0])
+
+        step.status = StepStatus.PENDING
+        await self.engine.execute_plan(plan)
+        self.assertEqual(len(self.engine.get_execution_log()), len(first_run))
+
+    async def test_log_sink_gets_every_entry_with_snap_every(self):
+        """Test snap_every thins the in-memory log while log_sink sees every entry"""
+        sunk = []
+        engine = WorkflowEngine(
+            tool_executor=self.tool_executor,
+            checkpoint_dir=self.test_dir / "checkpoints",
+            log_sink=sunk.append,
+            snap_every=3
+        )
+
+        for i in range(10):
+            engine._report_progress(f"step_{i}", "running", f"event {i}")
+
+        self.assertEqual([entry["message"] for entry in sunk], [f"event {i}" for i in range(10)])
+        self.assertIn("timestamp", sunk[0])
+        self.assertEqual(
+            [entry["message"] for entry in engine.get_execution_log()],
+            ["event 0", "event 3", "event 6", "event 9"]
+        )
+
+    async def test_execution_log_evicts_oldest(self):
+        """Test the in-memory log keeps only the newest EXEC_LOG_MAX entries"""
+        with mock.patch.object(workflow_engine, "EXEC_LOG_MAX", 5):
+            engine = WorkflowEngine(
+                tool_executor=self.tool_executor,
+                checkpoint_dir=self.test_dir / "checkpoints"
+            )
+
+        for i in range(12):
+            engine._report_progress(f"step_{i}", "running", f"event {i}")
+
+        self.assertEqual(
+            [entry["message"] for entry in engine.get_execution_log()],
+            [f"event {i}" for i in range(7, 12)]
+        )
+
+
+@unittest.skipUnless(shutil.which("git"), "needs git")
+class TestGitCheckpoints(unittest.IsolatedAsyncioTestCase):
+    """Test checkpoints that defer to git HEAD for tracked, clean files"""
+
+    def setUp(self):
+        """Set up a git repository with one committed file"""
+        self.test_dir = make_test_dir(self._testMethodName)
+        self.repo = self.test_dir / "repo"
+        self.repo.mkdir()
+        self.tracked = self.repo / "tracked.txt"
+        self.tracked.write_text("committed\n")
+        self.git("init", "-q")
+        self.git("add", "tracked.txt")
+        self.git("-c", "user.name=test", "-c", "user.email=test@example.com",
+                 "commit", "-q", "-m", "initial")
+
+        self.tool_executor = shared_executor(BASE_CONFIG, [self.test_dir])
+        self.engine = WorkflowEngine(
+            tool_executor=self.tool_executor,
+            checkpoint_dir=self.test_dir / "checkpoints"
+        )
+
+        # Small files normally stay in memory; force the on-disk/git path
+        patcher = mock.patch.object(workflow_engine, "CHECKPOINT_INMEM_THRESHOLD", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=self.repo, check=True, capture_output=True, text=True
+        ).stdout
+
+    def checkpoint(self, path: Path):
+        return self.engine._create_checkpoint(PlanStep(
+            "Overwrite file", "main", "write_file_tool", {"path": str(path), "content": "new\n"}
+        ))
+
+    async def test_clean_tracked_file_uses_git(self):
+        """Test a clean tracked file is checkpointed as a git ref and restored from HEAD"""
+        head = self.git("rev-parse", "HEAD").strip()
+        self.assertEqual(workflow_engine._git_clean_head(self.tracked), head)
+
+        checkpoint = self.checkpoint(self.tracked)
+        self.assertEqual(checkpoint.state_snapshot["git_ref"], head)
+        self.assertNotIn("backup_path", checkpoint.state_snapshot)
+
+        self.tracked.write_text("changed by the step\n")
+        await self.engine._rollback_all()
+        self.assertEqual(self.tracked.read_text(), "committed\n")
+
+    async def test_dirty_file_is_backed_up(self):
+        """Test a tracked file with uncommitted edits gets a real backup of those edits"""
+        self.tracked.write_text("uncommitted edit\n")
+        self.assertIsNone(workflow_engine._git_clean_head(self.tracked))
+
+        checkpoint = self.checkpoint(self.tracked)
+        self.assertNotIn("git_ref", checkpoint.state_snapshot)
+        self.assertIn("backup_path", checkpoint.state_snapshot)
+
+        self.tracked.write_text("changed by the step\n")
+        await self.engine._rollback_all()
+        self.assertEqual(self.tracked.read_text(), "uncommitted edit\n")
+
+    async def test_untracked_or_outside_repo_is_backed_up(self):
+        """Test untracked files and files outside any repository never use git"""
+        untracked = self.repo / "untracked.txt"
+        untracked.write_text("not in git\n")
+        outside = self.test_dir / "outside.txt"
+        outside.write_text("no repository\n")
+
+        for path, original in [(untracked, "not in git\n"), (outside, "no repository\n")]:
+            with self.subTest(path=path.name):
+                self.assertIsNone(workflow_engine._git_clean_head(path))
+                checkpoint = self.checkpoint(path)
+                self.assertNotIn("git_ref", checkpoint.state_snapshot)
+                self.assertIn("backup_path", checkpoint.state_snapshot)
+                path.write_text("changed by the step\n")
+
+        await self.engine._rollback_all()
+        self.assertEqual(untracked.read_text(), "not in git\n")
+        self.assertEqual(outside.read_text(), "no repository\n")
+
 
 class TestIntegration(unittest.IsolatedAsyncioTestCase):
     """Integration tests"""
 
     def setUp(self):
-        self.test_dir = Path(tempfile.mkdtemp())
-        self.config = {
-            "agent_settings": {"safe_mode": True, "timeout_seconds": 60},
-            "file_operations": {
-                "allow_file_write": True,
-                "allow_file_read": True,
-                "allowed_directories": [str(self.test_dir)],
-                "max_file_size_kb": 500
-            }
-        }
-        self.tool_executor = ToolExecutor(self.config)
+        self.test_dir = make_test_dir(self._testMethodName)
+        self.tool_executor = shared_executor(BASE_CONFIG, [self.test_dir])
         self.parser = PlanParser()
         self.engine = WorkflowEngine(self.tool_executor, checkpoint_dir=self.test_dir / "checkpoints")
 
-    def tearDown(self):
-        if self.test_dir.exists():
-            shutil.rmtree(self.test_dir)
-
     async def test_end_to_end_workflow(self):
         """Test complete workflow: parse → execute"""
         plan_text = f"""
@@ -504,6 +1447,72 @@ class TestIntegration(unittest.IsolatedAsyncioTestCase):
         self.assertTrue((self.test_dir / "e2e.txt").exists())
 
 
+class JSONLTestResult(unittest.TextTestResult):
+    """
+    Test result that streams one JSON line per finished test.
+
+    Records are appended to RESULTS_FILE as tests complete; a summary record
+    is appended (and SUMMARY_FILE rewritten) when the run stops.
+    """
+
+    RESULTS_FILE = "phase2_test_results.jsonl"
+    SUMMARY_FILE = "phase2_test_results.json"
+
+    def startTestRun(self):
+        super().startTestRun()
+        self._results_file = open(self.RESULTS_FILE, "wb")
+
+    def _record(self, test, status: str, **extra):
+        record = {
+            "test": test.id(),
+            "status": status,
+            "timestamp": datetime.now().isoformat(),
+            **extra
+        }
+        self._results_file.write(fast_json.dumps_bytes(record) + b"\n")
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "passed")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "failed", message=str(err[1]))
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record(test, "error", message=str(err[1]))
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            status = "failed" if issubclass(err[0], test.failureException) else "error"
+            self._record(subtest, status, message=str(err[1]))
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._record(test, "skipped", message=reason)
+
+    def stopTestRun(self):
+        super().stopTestRun()
+
+        successes = self.testsRun - len(self.failures) - len(self.errors)
+        summary = {
+            "timestamp": datetime.now().isoformat(),
+            "tests_run": self.testsRun,
+            "successes": successes,
+            "failures": len(self.failures),
+            "errors": len(self.errors),
+            "pass_rate": successes / self.testsRun * 100 if self.testsRun else 0.0
+        }
+
+        self._results_file.write(fast_json.dumps_bytes({"summary": summary}) + b"\n")
+        self._results_file.close()
+
+        with open(self.SUMMARY_FILE, "wb") as f:
+            f.write(fast_json.dumps_bytes(summary, indent=2))
+
+
 def run_tests():
     """Run all Phase 2 tests and generate report"""
     # Create test suite
@@ -513,38 +1522,32 @@ def run_tests():
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestPlanDataStructure))
     suite.addTests(loader.loadTestsFromTestCase(TestPlanParser))
+    suite.addTests(loader.loadTestsFromTestCase(TestToolExecutor))
+    suite.addTests(loader.loadTestsFromTestCase(TestPythonWorkerPool))
+    suite.addTests(loader.loadTestsFromTestCase(TestToolExecutorLoops))
     suite.addTests(loader.loadTestsFromTestCase(TestWorkflowEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestGitCheckpoints))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
 
-    # Run tests
-    runner = unittest.TextTestRunner(verbosity=2)
+    # Run tests (results stream to JSONL as each test finishes)
+    runner = unittest.TextTestRunner(verbosity=2, resultclass=JSONLTestResult)
     result = runner.run(suite)
 
+    successes = result.testsRun - len(result.failures) - len(result.errors)
+    pass_rate = successes / result.testsRun * 100 if result.testsRun else 0.0
+
     # Generate summary
     print("\n" + "=" * 70)
     print("PHASE 2 TEST SUMMARY")
     print("=" * 70)
     print(f"Tests Run: {result.testsRun}")
-    print(f"Successes: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Successes: {successes}")
     print(f"Failures: {len(result.failures)}")
     print(f"Errors: {len(result.errors)}")
-    print(f"Pass Rate: {((result.testsRun - len(result.failures) - len(result.errors)) / result.testsRun * 100):.1f}%")
+    print(f"Pass Rate: {pass_rate:.1f}%")
     print("=" * 70)
 
-    # Save results to JSON
-    results_data = {
-        "timestamp": "2025-11-11",
-        "tests_run": result.testsRun,
-        "successes": result.testsRun - len(result.failures) - len(result.errors),
-        "failures": len(result.failures),
-        "errors": len(result.errors),
-        "pass_rate": (result.testsRun - len(result.failures) - len(result.errors)) / result.testsRun * 100
-    }
-
-    with open("phase2_test_results.json", "w") as f:
-        json.dump(results_data, f, indent=2)
-
-    print("\n✅ Results saved to phase2_test_results.json\n")
+    print(f"\n✅ Results saved to {JSONLTestResult.RESULTS_FILE} and {JSONLTestResult.SUMMARY_FILE}\n")
 
     return result
 
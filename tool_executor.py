@@ -4,29 +4,456 @@ Provides safe execution of bash commands, Python scripts, and file operations fo
 """
 
 import asyncio
+import bisect
+import codecs
+import fnmatch
+import functools
+import io
 import subprocess
 import os
+import re
 import json
+import shlex
+import signal
+import sys
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Optional, List, Tuple, Any
+from typing import Dict, Optional, List, Tuple, Any, AsyncIterator, Awaitable
 from dataclasses import dataclass
 import logging
 
+import fast_json
+
+try:
+    from asyncio import timeout as async_timeout
+except ImportError:  # Python < 3.11 (async-timeout ships with aiohttp)
+    from async_timeout import timeout as async_timeout
+
+
+# Characters that need a real shell (pipes, globs, expansions, escapes,
+# comments, multiple lines); commands without them are exec'd directly
+_SHELL_SYNTAX_RE = re.compile(r'[|&;<>()$`*?\[\]{}~#!\\\n]')
+
+
+# Bytes read per chunk when streaming file contents
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _new_text_decoder() -> io.IncrementalNewlineDecoder:
+    """UTF-8 decoder with universal newlines, matching Path.read_text()"""
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+
+
+def _read_text_chunked(file_path: Path, chunk_size: int = READ_CHUNK_SIZE) -> str:
+    """
+    Read a UTF-8 text file in fixed-size chunks.
+
+    Peak memory is the decoded text plus one raw chunk, instead of the whole
+    file's bytes plus the decoded copy.
+    """
+    decoder = _new_text_decoder()
+    parts = []
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b'', final=True))
+    return ''.join(parts)
+
+
+def _file_entry(name: str, path: str, is_file: bool, is_dir: bool, size: int) -> Dict[str, Any]:
+    """One list_files record"""
+    return {"name": name, "path": path, "is_file": is_file, "is_dir": is_dir, "size": size}
+
+
+def _scan_directory(
+    directory: Path,
+    pattern: str,
+    subdirs: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    List the entries of one directory whose names match pattern.
+
+    Uses a single os.scandir pass: file types come from the readdir entry,
+    so only regular files need a stat() call (for their size). If subdirs
+    is given, the paths of real (non-symlink) subdirectories are appended
+    to it for a recursive caller.
+    """
+    file_info = []
+    try:
+        entries = os.scandir(directory)
+    except (FileNotFoundError, NotADirectoryError):
+        return file_info  # Path.glob() yields nothing here either
+
+    with entries:
+        for entry in entries:
+            if subdirs is not None and entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            if not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            is_file = entry.is_file()
+            file_info.append(_file_entry(
+                entry.name, entry.path, is_file, entry.is_dir(),
+                entry.stat().st_size if is_file else 0
+            ))
+
+    return file_info
+
+
+def _scan_tree(directory: Path, pattern: str) -> List[Dict[str, Any]]:
+    """
+    List entries matching pattern anywhere under directory (inclusive).
+
+    Equivalent to directory.glob("**/" + pattern): symlinked directories
+    are listed but not descended into.
+    """
+    file_info = []
+    pending = [directory]
+    while pending:
+        file_info.extend(_scan_directory(pending.pop(), pattern, pending))
+    return file_info
+
+
+def _recursive_name_pattern(pattern: str) -> Optional[str]:
+    """Return NAME for a "**/NAME" pattern whose NAME is a single level, else None"""
+    prefix, sep, name = pattern.partition('/')
+    if prefix == '**' and sep and name and name not in ('.', '..', '**') and '/' not in name and os.sep not in name:
+        return name
+    return None
+
+
+def _glob_directory(directory: Path, pattern: str) -> List[Dict[str, Any]]:
+    """List entries matching a multi-level or recursive glob pattern"""
+    file_info = []
+    for f in directory.glob(pattern):
+        is_file = f.is_file()
+        file_info.append(_file_entry(
+            f.name, str(f), is_file, f.is_dir(),
+            f.stat().st_size if is_file else 0
+        ))
+    return file_info
+
+
+def _list_matching(directory: Path, pattern: str) -> List[Dict[str, Any]]:
+    """Pick the cheapest traversal that can evaluate pattern"""
+    if pattern and pattern not in ('.', '..') and '/' not in pattern and os.sep not in pattern:
+        return _scan_directory(directory, pattern)
+    return _glob_directory(directory, pattern)
+
+
+async def _drain(stream: asyncio.StreamReader) -> bytearray:
+    """
+    Read a subprocess pipe to EOF in READ_CHUNK_SIZE pieces.
+
+    Chunks are appended to one growing bytearray rather than kept as a list
+    and joined, and the buffer is returned as-is (no final bytes() copy).
+    """
+    buf = bytearray()
+    while chunk := await stream.read(READ_CHUNK_SIZE):
+        buf += chunk
+    return buf
+
+
+# Start each subprocess as the leader of its own process group so the whole
+# tree (a shell and whatever it spawned) can be signalled at once
+if os.name == "nt":
+    _NEW_PROCESS_GROUP = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _NEW_PROCESS_GROUP = {"start_new_session": True}
+
+KILL_GRACE_SECONDS = 2.0
+
+
+async def _kill_process_tree(process: asyncio.subprocess.Process) -> None:
+    """
+    Terminate a subprocess started with _NEW_PROCESS_GROUP and its
+    descendants: polite signal first, SIGKILL after a short grace period,
+    then reap so no zombie is left.
+    """
+    def signal_group(sig) -> None:
+        try:
+            if os.name == "nt":
+                process.send_signal(sig)
+            else:
+                os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    signal_group(signal.CTRL_BREAK_EVENT if os.name == "nt" else signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), KILL_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+
+    # The leader may be gone while descendants still hold the pipes
+    if os.name == "nt":
+        if process.returncode is None:
+            process.kill()
+    else:
+        signal_group(signal.SIGKILL)
+    await process.wait()
+
+
+def _dir_prefix(path: Path) -> str:
+    """Path as a string ending in exactly one separator"""
+    s = str(path)
+    return s if s.endswith(os.sep) else s + os.sep
+
+
+def _prefix_table(directories) -> Tuple[str, ...]:
+    """
+    Sorted separator-terminated prefixes for resolved directories, with
+    directories nested inside another entry dropped (the outer one already
+    covers them), so a bisect lands on the only prefix that can match.
+    """
+    table: List[str] = []
+    for prefix in sorted(set(_dir_prefix(d) for d in directories)):
+        if not any(prefix.startswith(kept) for kept in table[-1:]):
+            table.append(prefix)
+    return tuple(table)
+
+
+class _LazyText:
+    """
+    Dataclass field descriptor holding str or raw subprocess bytes.
+
+    Bytes are decoded (UTF-8, errors='replace') on first read and the str
+    is kept, so output nobody looks at is never decoded.
+    """
+
+    def __set_name__(self, owner, name):
+        self.attr = '_' + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            # No class-level default, so the dataclass field stays required
+            raise AttributeError(self.attr)
+        value = obj.__dict__[self.attr]
+        if not isinstance(value, str):
+            value = obj.__dict__[self.attr] = value.decode('utf-8', errors='replace')
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.attr] = value
+
 
 @dataclass
 class ExecutionResult:
-    """Result of a tool execution"""
+    """Result of a tool execution (stdout/stderr may be given as bytes)"""
     success: bool
-    stdout: str
-    stderr: str
+    stdout: str = _LazyText()
+    stderr: str = _LazyText()
     return_code: int
     error_message: Optional[str] = None
     execution_time: float = 0.0
 
 
+# Dispatcher run by each PythonWorkerPool interpreter. Jobs arrive as JSON
+# lines on stdin; each one runs in a forked child of the warm interpreter
+# (fresh module state, real fds 1/2 captured to temp files) and the result
+# goes back on a private copy of stdout as a length-prefixed JSON frame.
+_WORKER_SOURCE = r"""
+import json, os, runpy, sys, tempfile, traceback
+
+ctl = os.fdopen(os.dup(1), "wb")
+devnull = os.open(os.devnull, os.O_RDWR)
+os.dup2(devnull, 1)
+
+for line in sys.stdin:
+    job = json.loads(line)
+    out, err = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+    pid = os.fork()
+    if pid == 0:
+        os.dup2(devnull, 0)
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        code = 0
+        try:
+            os.chdir(job["cwd"])
+            sys.argv = [job["path"], *job["argv"]]
+            sys.path[0] = os.path.dirname(os.path.abspath(job["path"]))
+            runpy.run_path(job["path"], run_name="__main__")
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    out.seek(0)
+    err.seek(0)
+    payload = json.dumps({
+        "return_code": os.waitstatus_to_exitcode(status),
+        "stdout": out.read().decode("utf-8", "replace"),
+        "stderr": err.read().decode("utf-8", "replace"),
+    }).encode("utf-8")
+    out.close()
+    err.close()
+    ctl.write(b"%d\n" % len(payload) + payload)
+    ctl.flush()
+"""
+
+
+class WorkerPoolUnavailable(RuntimeError):
+    """The pool could not take a job; nothing was sent, so running it elsewhere is safe"""
+
+
+class PythonWorkerPool:
+    """
+    Pool of long-lived Python interpreters for running scripts.
+
+    Each script runs in a child forked from a warm worker, so calls skip
+    interpreter startup while every script still gets a fresh process.
+    POSIX only (relies on os.fork). Workers start lazily, up to size.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.logger = logging.getLogger('PythonWorkerPool')
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.subprocess.Process] = []
+        self._starting = 0
+        self._reaping: set = set()  # wait() tasks for killed workers
+
+    async def _acquire(self) -> asyncio.subprocess.Process:
+        """Get an idle worker, starting one if the pool is not full"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Subprocess transports are bound to the loop that created them
+            self.close()
+            self._loop = loop
+            self._idle = asyncio.Queue()
+
+        while True:
+            if self._idle.empty() and self._starting + len(self._workers) < self.size:
+                # Reserve the slot before awaiting so concurrent callers don't overshoot
+                self._starting += 1
+                try:
+                    worker = await asyncio.create_subprocess_exec(
+                        sys.executable, "-c", _WORKER_SOURCE,
+                        stdin=asyncio.subprocess.PIPE,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.DEVNULL,
+                        start_new_session=True
+                    )
+                finally:
+                    self._starting -= 1
+                self._workers.append(worker)
+                return worker
+
+            worker = await self._idle.get()
+            if worker is not None:
+                return worker
+            # None: a worker was discarded, so there is room to start one
+
+    def _discard(self, worker: asyncio.subprocess.Process) -> None:
+        """
+        Kill a worker (and any running script), drop it from the pool and
+        wake one caller waiting for a worker so it can start a replacement
+        """
+        if worker in self._workers:
+            self._workers.remove(worker)
+            if self._idle is not None:
+                self._idle.put_nowait(None)
+        try:
+            os.killpg(worker.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+        # Reap it on its own loop so neither a zombie nor an open transport lingers
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if loop is self._loop:
+            task = loop.create_task(worker.wait())
+            self._reaping.add(task)
+            task.add_done_callback(self._reaping.discard)
+
+    def close(self) -> None:
+        """Kill all workers"""
+        # Detach the queue first: it may belong to a loop that is already closed
+        self._idle = None
+        for worker in list(self._workers):
+            self._discard(worker)
+
+    async def aclose(self) -> None:
+        """Kill all workers and wait for them to exit (from the pool's own loop)"""
+        workers = list(self._workers)
+        self.close()
+        for worker in workers:
+            await worker.wait()
+        if self._reaping:
+            await asyncio.gather(*self._reaping)
+
+    async def run(
+        self,
+        script_path: Path,
+        args: List[str],
+        timeout: int
+    ) -> Dict[str, Any]:
+        """
+        Run a script in a forked child of a pooled worker
+
+        Returns:
+            Dict with return_code, stdout and stderr
+
+        Raises:
+            WorkerPoolUnavailable: If no worker could be started (job not sent)
+            asyncio.TimeoutError: If no worker frees up or the script does not
+                                  finish within timeout (its worker is killed)
+            RuntimeError: If the worker died or sent a malformed frame; the
+                          script may already have run
+        """
+        job = json.dumps({
+            "path": str(script_path),
+            "argv": list(args),
+            "cwd": os.getcwd()
+        }).encode('utf-8') + b"\n"
+
+        worker = None
+        try:
+            # Waiting for a busy pool counts against the call's timeout too
+            async with async_timeout(timeout):
+                try:
+                    worker = await self._acquire()
+                except Exception as e:
+                    raise WorkerPoolUnavailable(f"Could not start Python worker: {e}") from e
+
+                worker.stdin.write(job)
+                await worker.stdin.drain()
+                header = await worker.stdout.readline()
+                if not header:
+                    raise RuntimeError("Python worker exited unexpectedly")
+                payload = await worker.stdout.readexactly(int(header))
+        except BaseException:
+            if worker is not None:
+                self._discard(worker)
+            raise
+
+        self._idle.put_nowait(worker)
+        return json.loads(payload)
+
+
 class ToolExecutor:
     """Executes tools safely for AI agents"""
 
+    # Deletes every shell chaining/redirection character; a command whose
+    # length is unchanged by translate() contains none of them
+    _META_TABLE = str.maketrans('', '', ';&|<>')
+
+    # A pipe whose receiving end is a read-only filter tool
+    _SAFE_PIPE_RE = re.compile(r'\|\s*(grep|wc|sort|head|tail)\b')
+
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the tool executor
@@ -44,79 +471,178 @@ class ToolExecutor:
         self.safe_mode = agent_settings.get("safe_mode", True)
         self.timeout_seconds = agent_settings.get("timeout_seconds", 60)
         self.code_execution_timeout = agent_settings.get("timeout_overrides", {}).get("code_execution", 180)
+        self.max_concurrent_subprocesses = agent_settings.get(
+            "max_concurrent_subprocesses", os.cpu_count() or 4
+        )
+        # Created per event loop by _proc_slots (asyncio primitives bind to one loop)
+        self._proc_sem: Optional[asyncio.Semaphore] = None
+        self._proc_sem_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Optional warm-interpreter pool for execute_python_script (0 = off)
+        pool_size = agent_settings.get("python_worker_pool_size", 0)
+        self._python_pool = (
+            PythonWorkerPool(pool_size) if pool_size > 0 and hasattr(os, "fork") else None
+        )
 
         self.allow_file_write = file_ops.get("allow_file_write", True)
         self.allow_file_read = file_ops.get("allow_file_read", True)
-        self.allowed_directories = [Path(d) for d in file_ops.get("allowed_directories", [])]
+        self.set_allowed_dirs(file_ops.get("allowed_directories", []))
         self.max_file_size_kb = file_ops.get("max_file_size_kb", 500)
 
         # Whitelist of safe bash commands
-        self.safe_bash_commands = {
+        self.safe_bash_commands = frozenset({
             'ls', 'cat', 'pwd', 'echo', 'grep', 'find', 'wc', 'head', 'tail',
             'mkdir', 'touch', 'cp', 'mv', 'python', 'python3', 'pip', 'git',
             'node', 'npm', 'pytest', 'test', 'diff', 'sort', 'uniq', 'sed', 'awk'
-        }
+        })
 
         # Blacklist of dangerous commands
-        self.dangerous_commands = {
+        self.dangerous_commands = frozenset({
             'rm', 'rmdir', 'dd', 'mkfs', 'format', 'fdisk', 'chmod', 'chown',
             'sudo', 'su', 'kill', 'killall', 'reboot', 'shutdown', 'halt',
             'systemctl', 'service'
-        }
+        })
+
+        # Shell chaining/redirection operators, longest alternatives first
+        self._shell_meta_re = re.compile(r'(;|&&|\|\||\||>>|>|<)')
+
+        # Session caches: validation verdicts keyed on (safe_mode, command), and
+        # file contents keyed on resolved path, checked against (mtime_ns, size)
+        self._validate_cached = functools.lru_cache(maxsize=256)(self._check_bash_command)
+        self._read_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self.read_cache_max_entries = 128
+        self.read_cache_hits = 0
+        self.read_cache_misses = 0
+
+        # Resolved parent directories write_file has already created
+        self._known_dirs: set = set()
+
+    def set_allowed_dirs(self, directories: List[Any]) -> None:
+        """
+        Replace the allowed directories after construction
+
+        Args:
+            directories: Paths (str or Path) that file operations may touch
+        """
+        self.allowed_directories = [Path(d) for d in directories]
+        self._allowed_prefixes = _prefix_table(self._resolve(d) for d in self.allowed_directories)
+
+    def _resolve(self, path: Path) -> Path:
+        """
+        Resolve a path to an absolute real path.
+
+        Never cached: a symlink inside an allowed directory can be re-pointed
+        at any time, so the target is walked again on every check. Only the
+        allowed roots are resolved once, in set_allowed_dirs.
+        """
+        return Path(path).resolve()
 
     def _is_path_allowed(self, path: Path) -> bool:
         """Check if a path is within allowed directories"""
-        if not self.allowed_directories:
-            return True
+        return self._allowed_path(path) is not None
 
+    def _allowed_path(self, path: Path) -> Optional[Path]:
+        """Resolve path, returning None if it is outside the allowed directories"""
         try:
-            path = path.resolve()
-            for allowed_dir in self.allowed_directories:
-                allowed_dir = allowed_dir.resolve()
-                if path == allowed_dir or allowed_dir in path.parents:
-                    return True
+            resolved = self._resolve(path)
         except Exception as e:
             self.logger.error(f"Error checking path {path}: {e}")
-            return False
+            return None
+
+        if not self.allowed_directories:
+            return resolved
 
-        return False
+        # Prefixes never nest, so only the greatest one <= p can contain it
+        p = _dir_prefix(resolved)
+        idx = bisect.bisect_right(self._allowed_prefixes, p) - 1
+        if idx >= 0 and p.startswith(self._allowed_prefixes[idx]):
+            return resolved
+        return None
+
+    def _proc_slots(self) -> asyncio.Semaphore:
+        """Subprocess concurrency limiter for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._proc_sem_loop is not loop:
+            # Waiters from an old loop can never be woken from this one
+            self._proc_sem = asyncio.Semaphore(self.max_concurrent_subprocesses)
+            self._proc_sem_loop = loop
+        return self._proc_sem
 
     def _validate_bash_command(self, command: str) -> Tuple[bool, Optional[str]]:
         """
-        Validate a bash command for safety
+        Validate a bash command for safety (memoized per safe_mode)
 
         Returns:
             Tuple of (is_valid, error_message)
         """
+        return self._validate_cached(self.safe_mode, command)
+
+    def _check_bash_command(self, safe_mode: bool, command: str) -> Tuple[bool, Optional[str]]:
+        """Uncached body of _validate_bash_command"""
         if not command or not command.strip():
             return False, "Empty command"
 
-        # Extract the base command
-        base_command = command.strip().split()[0]
-
-        # Remove leading path if present
-        base_command = os.path.basename(base_command)
+        # Extract the base command, removing leading path if present
+        base_command = os.path.basename(command.split(None, 1)[0])
 
         # Check for dangerous commands
         if base_command in self.dangerous_commands:
             return False, f"Dangerous command '{base_command}' not allowed in safe mode"
 
         # In safe mode, only allow whitelisted commands
-        if self.safe_mode and base_command not in self.safe_bash_commands:
+        if safe_mode and base_command not in self.safe_bash_commands:
             return False, f"Command '{base_command}' not in safe command whitelist"
 
-        # Check for command chaining that might be dangerous
-        dangerous_patterns = [';', '&&', '||', '|', '>', '>>', '<']
-        if self.safe_mode:
-            for pattern in dangerous_patterns:
-                if pattern in command:
-                    # Allow some safe patterns like pipes to grep
-                    if pattern == '|' and any(safe in command for safe in ['grep', 'wc', 'sort', 'head', 'tail']):
-                        continue
-                    return False, f"Command chaining pattern '{pattern}' not allowed in safe mode"
+        # Check for command chaining that might be dangerous; the single-pass
+        # translate() tripwire skips the operator scan for clean commands
+        if safe_mode and len(command.translate(self._META_TABLE)) != len(command):
+            for match in self._shell_meta_re.finditer(command):
+                pattern = match.group()
+                # Allow pipes into a safe filter (checked at this pipe, one anchored match)
+                if pattern == '|' and self._SAFE_PIPE_RE.match(command, match.start()):
+                    continue
+                return False, f"Command chaining pattern '{pattern}' not allowed in safe mode"
 
         return True, None
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters for the session caches
+
+        Returns:
+            Dictionary with read-cache and validation-cache statistics
+        """
+        validation = self._validate_cached.cache_info()
+        return {
+            "read_cache": {
+                "hits": self.read_cache_hits,
+                "misses": self.read_cache_misses,
+                "entries": len(self._read_cache),
+                "max_entries": self.read_cache_max_entries
+            },
+            "validation_cache": {
+                "hits": validation.hits,
+                "misses": validation.misses,
+                "entries": validation.currsize,
+                "max_entries": validation.maxsize
+            }
+        }
+
+    def _split_simple_command(self, command: str) -> Optional[List[str]]:
+        """
+        Split a command into an argv list when it needs no shell features
+
+        Returns:
+            argv list, or None if the command must run through the shell
+        """
+        if _SHELL_SYNTAX_RE.search(command):
+            return None
+
+        try:
+            return shlex.split(command) or None
+        except ValueError:
+            return None
+
     async def execute_bash(
         self,
         command: str,
@@ -156,53 +682,109 @@ class ToolExecutor:
                 error_message=f"Working directory {working_dir} not in allowed directories"
             )
 
-        # Execute command
+        # In safe mode, plain commands skip the intermediate /bin/sh
+        argv = self._split_simple_command(command) if self.safe_mode else None
         timeout_val = timeout or self.timeout_seconds
 
-        try:
-            import time
-            start_time = time.time()
+        if argv:
+            return await self._execute_argv(argv, working_dir, timeout_val)
+        return await self._run_subprocess(command, None, working_dir, timeout_val)
 
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=working_dir
-            )
+    async def _execute_argv(
+        self,
+        argv: List[str],
+        cwd: Optional[Path],
+        timeout: int
+    ) -> ExecutionResult:
+        """Run argv directly with create_subprocess_exec (no shell)"""
+        return await self._run_subprocess(shlex.join(argv), argv, cwd, timeout)
 
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout_val
-            )
+    async def _run_subprocess(
+        self,
+        command: str,
+        argv: Optional[List[str]],
+        cwd: Optional[Path],
+        timeout_val: int
+    ) -> ExecutionResult:
+        """
+        Start a subprocess, wait for it under a deadline and collect output
 
-            execution_time = time.time() - start_time
+        Args:
+            command: Command line (run through the shell when argv is None)
+            argv: Argument vector to exec directly, bypassing the shell
+            cwd: Optional working directory
+            timeout_val: Timeout in seconds
 
-            return ExecutionResult(
-                success=process.returncode == 0,
-                stdout=stdout.decode('utf-8', errors='replace'),
-                stderr=stderr.decode('utf-8', errors='replace'),
-                return_code=process.returncode,
-                execution_time=execution_time
-            )
+        Returns:
+            ExecutionResult with process output
+        """
+        # Bound simultaneous fork+exec; extra callers queue here rather than fail
+        async with self._proc_slots():
+            process = None
+            finished = False
+            try:
+                start_time = time.time()
 
-        except asyncio.TimeoutError:
-            self.logger.error(f"Command timeout: {command}")
-            return ExecutionResult(
-                success=False,
-                stdout="",
-                stderr="",
-                return_code=-1,
-                error_message=f"Command timed out after {timeout_val} seconds"
-            )
-        except Exception as e:
-            self.logger.error(f"Error executing command: {e}")
-            return ExecutionResult(
-                success=False,
-                stdout="",
-                stderr="",
-                return_code=-1,
-                error_message=str(e)
-            )
+                if argv:
+                    process = await asyncio.create_subprocess_exec(
+                        *argv,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                        cwd=cwd,
+                        **_NEW_PROCESS_GROUP
+                    )
+                else:
+                    process = await asyncio.create_subprocess_shell(
+                        command,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                        cwd=cwd,
+                        **_NEW_PROCESS_GROUP
+                    )
+
+                async with async_timeout(timeout_val):
+                    # Drain both pipes concurrently so neither can fill and block the child
+                    stdout, stderr = await asyncio.gather(
+                        _drain(process.stdout),
+                        _drain(process.stderr)
+                    )
+                    await process.wait()
+                finished = True
+
+                execution_time = time.time() - start_time
+
+                # Raw bytes; ExecutionResult decodes each stream on first access
+                return ExecutionResult(
+                    success=process.returncode == 0,
+                    stdout=stdout,
+                    stderr=stderr,
+                    return_code=process.returncode,
+                    execution_time=execution_time
+                )
+
+            except asyncio.TimeoutError:
+                self.logger.error(f"Command timeout: {command}")
+                return ExecutionResult(
+                    success=False,
+                    stdout="",
+                    stderr="",
+                    return_code=-1,
+                    error_message=f"Command timed out after {timeout_val} seconds"
+                )
+            except Exception as e:
+                self.logger.error(f"Error executing command: {e}")
+                return ExecutionResult(
+                    success=False,
+                    stdout="",
+                    stderr="",
+                    return_code=-1,
+                    error_message=str(e)
+                )
+            finally:
+                # Timed out, cancelled or failed mid-run: don't leave the
+                # shell's children (or their open pipes) behind
+                if process is not None and not finished:
+                    await _kill_process_tree(process)
 
     async def execute_python_script(
         self,
@@ -240,16 +822,67 @@ class ToolExecutor:
                 error_message=f"Script {script_path} not in allowed directories"
             )
 
-        # Build command
-        cmd_parts = ["python3", str(script_path)]
-        if args:
-            cmd_parts.extend(args)
-        command = " ".join(cmd_parts)
+        timeout_val = timeout or self.code_execution_timeout
+
+        if self._python_pool:
+            result = await self._execute_pooled(script_path, args or [], timeout_val)
+            if result is not None:
+                return result
 
-        # Execute using bash executor with code execution timeout
-        return await self.execute_bash(
-            command,
-            timeout=timeout or self.code_execution_timeout
+        # Run the current interpreter directly; args are passed through verbatim
+        return await self._execute_argv(
+            [sys.executable, str(script_path), *(args or [])],
+            cwd=None,
+            timeout=timeout_val
+        )
+
+    async def _execute_pooled(
+        self,
+        script_path: Path,
+        args: List[str],
+        timeout_val: int
+    ) -> Optional[ExecutionResult]:
+        """
+        Run a script on the warm worker pool
+
+        Returns:
+            ExecutionResult, or None if the pool could not take the job and
+            the caller should fall back to a fresh interpreter. Once the job
+            has been sent the script may have run, so later failures are
+            reported instead of retried.
+        """
+        async with self._proc_slots():
+            start_time = time.time()
+            try:
+                reply = await self._python_pool.run(script_path, args, timeout_val)
+            except asyncio.TimeoutError:
+                self.logger.error(f"Script timeout: {script_path}")
+                return ExecutionResult(
+                    success=False,
+                    stdout="",
+                    stderr="",
+                    return_code=-1,
+                    error_message=f"Command timed out after {timeout_val} seconds"
+                )
+            except WorkerPoolUnavailable as e:
+                self.logger.warning(f"Python worker pool unavailable, falling back to exec: {e}")
+                return None
+            except Exception as e:
+                self.logger.error(f"Python worker failed running {script_path}: {e}")
+                return ExecutionResult(
+                    success=False,
+                    stdout="",
+                    stderr="",
+                    return_code=-1,
+                    error_message=f"Python worker failed: {e}"
+                )
+
+        return ExecutionResult(
+            success=reply["return_code"] == 0,
+            stdout=reply["stdout"],
+            stderr=reply["stderr"],
+            return_code=reply["return_code"],
+            execution_time=time.time() - start_time
         )
 
     async def read_file(self, file_path: Path) -> ExecutionResult:
@@ -282,7 +915,8 @@ class ToolExecutor:
 
         try:
             # Check file size
-            size_kb = file_path.stat().st_size / 1024
+            st = await asyncio.to_thread(file_path.stat)
+            size_kb = st.st_size / 1024
             if size_kb > self.max_file_size_kb:
                 return ExecutionResult(
                     success=False,
@@ -292,7 +926,19 @@ class ToolExecutor:
                     error_message=f"File too large: {size_kb:.1f}KB (max: {self.max_file_size_kb}KB)"
                 )
 
-            content = file_path.read_text(encoding='utf-8')
+            key = str(self._resolve(file_path))
+            cached = self._read_cache.get(key)
+            if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                self._read_cache.move_to_end(key)
+                self.read_cache_hits += 1
+                content = cached[2]
+            else:
+                self.read_cache_misses += 1
+                content = await asyncio.to_thread(_read_text_chunked, file_path)
+                self._read_cache[key] = (st.st_mtime_ns, st.st_size, content)
+                self._read_cache.move_to_end(key)
+                if len(self._read_cache) > self.read_cache_max_entries:
+                    self._read_cache.popitem(last=False)
 
             return ExecutionResult(
                 success=True,
@@ -310,11 +956,58 @@ class ToolExecutor:
                 error_message=f"Error reading file: {e}"
             )
 
+    async def iter_file_chunks(
+        self,
+        file_path: Path,
+        chunk_size: int = READ_CHUNK_SIZE
+    ) -> AsyncIterator[str]:
+        """
+        Stream a text file as decoded chunks
+
+        Applies the same permission and size checks as read_file, but yields
+        text as it is read so callers never hold the whole file.
+
+        Args:
+            file_path: Path to file
+            chunk_size: Bytes to read per chunk
+
+        Yields:
+            Decoded text chunks
+
+        Raises:
+            PermissionError: If reads are disabled or the path is not allowed
+            ValueError: If the file exceeds max_file_size_kb
+        """
+        if not self.allow_file_read:
+            raise PermissionError("File read operations are disabled")
+
+        if not self._is_path_allowed(file_path):
+            raise PermissionError(f"File {file_path} not in allowed directories")
+
+        st = await asyncio.to_thread(file_path.stat)
+        size_kb = st.st_size / 1024
+        if size_kb > self.max_file_size_kb:
+            raise ValueError(f"File too large: {size_kb:.1f}KB (max: {self.max_file_size_kb}KB)")
+
+        decoder = _new_text_decoder()
+        f = await asyncio.to_thread(open, file_path, 'rb')
+        try:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            text = decoder.decode(b'', final=True)
+            if text:
+                yield text
+        finally:
+            f.close()
+
     async def write_file(
         self,
         file_path: Path,
         content: str,
-        overwrite: bool = False
+        overwrite: bool = False,
+        barrier: Optional[Awaitable[Any]] = None
     ) -> ExecutionResult:
         """
         Write to a file safely
@@ -323,6 +1016,8 @@ class ToolExecutor:
             file_path: Path to file
             content: Content to write
             overwrite: Whether to overwrite existing file
+            barrier: Optional awaitable (e.g. a pending backup of the file)
+                     that must complete before the file is opened for writing
 
         Returns:
             ExecutionResult indicating success
@@ -336,7 +1031,9 @@ class ToolExecutor:
                 error_message="File write operations are disabled"
             )
 
-        if not self._is_path_allowed(file_path):
+        # Work on the path the allow-check resolved rather than resolving again
+        target = self._allowed_path(file_path)
+        if target is None:
             return ExecutionResult(
                 success=False,
                 stdout="",
@@ -345,22 +1042,44 @@ class ToolExecutor:
                 error_message=f"File {file_path} not in allowed directories"
             )
 
-        # Check if file exists and overwrite is not allowed
-        if file_path.exists() and not overwrite:
-            return ExecutionResult(
-                success=False,
-                stdout="",
-                stderr="",
-                return_code=-1,
-                error_message=f"File {file_path} already exists (use overwrite=True to replace)"
-            )
+        parent = str(target.parent)
+
+        # mtime granularity can hide a same-size rewrite, so drop it explicitly
+        self._read_cache.pop(str(target), None)
+
+        def _write() -> bool:
+            # Check if file exists and overwrite is not allowed
+            if not overwrite and target.exists():
+                return False
+
+            # Create parent directories once per session, not on every write
+            if parent not in self._known_dirs:
+                os.makedirs(parent, exist_ok=True)
+                self._known_dirs.add(parent)
+
+            try:
+                target.write_text(content, encoding='utf-8')
+            except FileNotFoundError:
+                # Parent was removed behind our back; recreate it and retry once
+                self._known_dirs.discard(parent)
+                os.makedirs(parent, exist_ok=True)
+                self._known_dirs.add(parent)
+                target.write_text(content, encoding='utf-8')
+            return True
 
         try:
-            # Create parent directories if needed
-            file_path.parent.mkdir(parents=True, exist_ok=True)
+            if barrier is not None:
+                await barrier
 
-            # Write file
-            file_path.write_text(content, encoding='utf-8')
+            # One thread hop for the whole exists + mkdir + write sequence
+            if not await asyncio.to_thread(_write):
+                return ExecutionResult(
+                    success=False,
+                    stdout="",
+                    stderr="",
+                    return_code=-1,
+                    error_message=f"File {file_path} already exists (use overwrite=True to replace)"
+                )
 
             return ExecutionResult(
                 success=True,
@@ -403,21 +1122,25 @@ class ToolExecutor:
             )
 
         try:
-            files = list(directory.glob(pattern))
-            file_info = [
-                {
-                    "name": f.name,
-                    "path": str(f),
-                    "is_file": f.is_file(),
-                    "is_dir": f.is_dir(),
-                    "size": f.stat().st_size if f.is_file() else 0
-                }
-                for f in files
-            ]
+            name_pattern = _recursive_name_pattern(pattern)
+            if name_pattern is not None:
+                # "**/NAME": scan the top level, then walk each subtree in its own
+                # worker thread so independent directories are read concurrently
+                subdirs: List[str] = []
+                file_info = await asyncio.to_thread(_scan_directory, directory, name_pattern, subdirs)
+                subtrees = await asyncio.gather(*(
+                    asyncio.to_thread(_scan_tree, Path(subdir), name_pattern)
+                    for subdir in subdirs
+                ))
+                for entries in subtrees:
+                    file_info.extend(entries)
+            else:
+                # Traversal and per-file stats run in one worker thread, off the event loop
+                file_info = await asyncio.to_thread(_list_matching, directory, pattern)
 
             return ExecutionResult(
                 success=True,
-                stdout=json.dumps(file_info, indent=2),
+                stdout=fast_json.dumps(file_info),
                 stderr="",
                 return_code=0
             )
@@ -6,17 +6,347 @@ checkpointing, and rollback capabilities.
 """
 
 import asyncio
-import json
+import concurrent.futures
+import difflib
+import errno
+import functools
+import hashlib
+import itertools
 import logging
+import marshal
+import os
 import shutil
+import subprocess
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from collections import defaultdict, deque
 from pathlib import Path
-from typing import Dict, List, Optional, Callable, Any, Tuple
+from typing import Dict, List, Optional, Callable, Any, Awaitable, Iterator, Tuple
 from datetime import datetime
 from enum import Enum
 
+import fast_json
 from plan import Plan, PlanStep, StepStatus
 from tool_executor import ToolExecutor
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Linux reflink ioctl, _IOW(0x94, 9, int): share extents on btrfs/xfs/etc.
+FICLONE = 0x40049409
+
+# Errors meaning "this filesystem/kernel can't do that", not a real failure
+_COPY_UNSUPPORTED = frozenset({
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTTY, errno.EBADF,
+    errno.EOPNOTSUPP, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP)
+})
+
+
+# Most recent progress events kept in WorkflowEngine.execution_log
+EXEC_LOG_MAX = 10_000
+
+# Reverse deltas diff at most this many changed lines (after trimming the
+# common head and tail), and only when they overlap at least this much
+DELTA_MAX_LINES = 2_000
+DELTA_MIN_RATIO = 0.5
+
+# Progress events are delivered to callbacks in batches at most this often (seconds)
+PROGRESS_FLUSH_INTERVAL = 0.05
+
+# Files up to this size are checkpointed in memory rather than copied to disk
+CHECKPOINT_INMEM_THRESHOLD = 1 << 20
+
+
+def _read_into(file_path: Path, size_hint: int) -> bytearray:
+    """Read a whole file into one preallocated bytearray (size_hint from stat)"""
+    buf = bytearray(size_hint)
+    got = 0
+    with open(file_path, 'rb', buffering=0) as f:
+        with memoryview(buf) as view:
+            while got < size_hint and (n := f.readinto(view[got:])):
+                got += n
+        del buf[got:]  # file shrank since stat
+        buf += f.read()  # file grew since stat
+    return buf
+
+
+def _write_replace(
+    file_path: Path,
+    data: bytes,
+    st: Optional[os.stat_result] = None,
+    durable: bool = False
+) -> None:
+    """
+    Atomically replace file_path with data via a temp file and os.replace,
+    restoring permissions and timestamps from st if given. Without st, an
+    existing file keeps its mode and a new one gets the umask default. A
+    symlinked file_path is written through, replacing the link's target.
+    With durable, the data and the directory entry are fsynced as well.
+    """
+    file_path = Path(os.path.realpath(file_path))
+    mode = None
+    if st is None:
+        try:
+            mode = os.stat(file_path).st_mode & 0o7777
+        except FileNotFoundError:
+            pass
+
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with memoryview(data) as view:
+            written = 0
+            while written < len(view):
+                written += os.write(fd, view[written:])
+        if durable:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    try:
+        if st is not None:
+            os.chmod(tmp_path, st.st_mode & 0o7777)
+            os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        elif mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if durable:
+        _fsync_dir(file_path.parent)
+
+
+def _digest(data: bytes) -> bytes:
+    """Content fingerprint used to check a reverse delta still applies"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _make_reverse_delta(old: bytes, new: bytes) -> bytes:
+    """
+    Encode how to rebuild old from new, line by line: runs of lines kept
+    from new are stored as (start, end) index pairs, anything else as the
+    literal old bytes. Returned zlib-compressed.
+
+    The common head and tail are matched in linear time. SequenceMatcher
+    (quadratic in the worst case) only runs on what is left between them,
+    and only when that is at most DELTA_MAX_LINES lines and similar enough;
+    otherwise the old middle is stored literally.
+    """
+    new_lines = new.splitlines(keepends=True)
+    old_lines = old.splitlines(keepends=True)
+
+    limit = min(len(new_lines), len(old_lines))
+    head = 0
+    while head < limit and new_lines[head] == old_lines[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and new_lines[-1 - tail] == old_lines[-1 - tail]:
+        tail += 1
+    new_mid = new_lines[head:len(new_lines) - tail]
+    old_mid = old_lines[head:len(old_lines) - tail]
+
+    ops = []
+    if head:
+        ops.append((0, head))
+
+    matcher = None
+    if new_mid and old_mid and max(len(new_mid), len(old_mid)) <= DELTA_MAX_LINES:
+        matcher = difflib.SequenceMatcher(None, new_mid, old_mid)
+        # Linear-time upper bounds on similarity: skip the diff when it can't pay off
+        if matcher.real_quick_ratio() < DELTA_MIN_RATIO or matcher.quick_ratio() < DELTA_MIN_RATIO:
+            matcher = None
+
+    if matcher is not None:
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                ops.append((head + i1, head + i2))
+            elif j1 != j2:
+                ops.append(b''.join(old_mid[j1:j2]))
+    elif old_mid:
+        ops.append(b''.join(old_mid))
+
+    if tail:
+        ops.append((len(new_lines) - tail, len(new_lines)))
+    return zlib.compress(marshal.dumps(ops))
+
+
+def _apply_reverse_delta(new: bytes, delta: bytes) -> bytes:
+    """Rebuild the original bytes from new and a _make_reverse_delta result"""
+    new_lines = new.splitlines(keepends=True)
+    return b''.join(
+        op if isinstance(op, bytes) else b''.join(new_lines[op[0]:op[1]])
+        for op in marshal.loads(zlib.decompress(delta))
+    )
+
+
+def _as_path(value: Any) -> Path:
+    """Tool argument as a Path (no new object if it already is one)"""
+    return value if isinstance(value, Path) else Path(value)
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Make directory entries durable (no-op where directories can't be opened)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _file_equals(file_path: Path, data: bytes) -> bool:
+    """Whether a file's contents are exactly data, stopping at the first difference"""
+    block = 1 << 20
+    with open(file_path, 'rb') as f:
+        for offset in range(0, len(data), block):
+            if f.read(block) != data[offset:offset + block]:
+                return False
+        return not f.read(1)
+
+
+GIT_TIMEOUT = 5
+
+
+def _git_clean_head(file_path: Path) -> Optional[str]:
+    """
+    HEAD commit sha if file_path is tracked by git and unmodified (in both
+    the index and the work tree), else None.
+    """
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=file_path.parent, check=True,
+            capture_output=True, text=True, timeout=GIT_TIMEOUT
+        ).stdout
+
+    try:
+        # Untracked and ignored files are listed too, so empty output means
+        # tracked and clean
+        if git("status", "--porcelain", "--ignored", "--", file_path.name).strip():
+            return None
+        if not git("ls-files", "--", file_path.name).strip():
+            return None
+        return git("rev-parse", "HEAD").strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None  # no git, not a repository, no commits yet, ...
+
+
+def _hash_file(file_path: Path) -> str:
+    """Hex blake2b digest of a file's contents, read in 1 MiB blocks"""
+    h = hashlib.blake2b()
+    buf = bytearray(1 << 20)
+    with open(file_path, 'rb', buffering=0) as f, memoryview(buf) as view:
+        while n := f.readinto(buf):
+            h.update(view[:n])
+    return h.hexdigest()
+
+
+# Dedicated threads for checkpoint/rollback file I/O, so backups never queue
+# behind (or starve) the default executor that ToolExecutor's to_thread uses
+_CHECKPOINT_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4,
+    thread_name_prefix="wf-ckpt"
+)
+
+
+async def _run_checkpoint_io(func: Callable, *args: Any) -> Any:
+    """
+    Run blocking checkpoint I/O on the checkpoint pool.
+
+    If the awaiting task is cancelled, the cancellation is held until the
+    I/O finishes, so a cancelled workflow never leaves a half-written
+    backup or a half-restored file.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_CHECKPOINT_POOL, functools.partial(func, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        try:
+            await future
+        except Exception:
+            pass
+        raise
+
+
+@functools.lru_cache(maxsize=32)
+def _read_state_marshaled(path_str: str, mtime_ns: int, size: int) -> bytes:
+    """
+    Parse a saved workflow state and keep it marshaled. Cached on (path,
+    mtime, size), so a file rewritten by save_state is re-read.
+    """
+    with open(path_str, 'rb') as f:
+        return marshal.dumps(fast_json.loads(f.read()))
+
+
+def _read_state(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Parsed workflow state as a fresh object tree the caller may mutate.
+    Unmarshaling the cached bytes is a C-level deep copy, cheaper than both
+    re-parsing the JSON and copy.deepcopy.
+    """
+    return marshal.loads(_read_state_marshaled(path_str, mtime_ns, size))
+
+
+def _kernel_copy(src_fd: int, dst_fd: int) -> bool:
+    """
+    Copy file contents without passing them through user space.
+
+    Tries a reflink clone first, then os.copy_file_range. Returns False if
+    neither is supported for these files, or if copy_file_range came up
+    short of the source size (some FUSE/procfs files report 0 bytes); the
+    caller then copies in user space.
+    """
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError as e:
+        if e.errno not in _COPY_UNSUPPORTED:
+            raise
+
+    try:
+        size = os.fstat(src_fd).st_size
+        copied = 0
+        while n := os.copy_file_range(src_fd, dst_fd, 1 << 30):
+            copied += n
+        return copied >= size
+    except OSError as e:
+        if e.errno not in _COPY_UNSUPPORTED:
+            raise
+
+    return False
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """
+    Copy a file with its metadata, like shutil.copy2, as cheaply as the
+    filesystem allows: reflink, then in-kernel copy_file_range, then
+    shutil.copyfile (which itself uses sendfile where it can).
+    """
+    copied = False
+    if fcntl is not None and hasattr(os, "copy_file_range"):
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            copied = _kernel_copy(fsrc.fileno(), fdst.fileno())
+
+    if not copied:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+class NonRetryableStepError(Exception):
+    """A step failure that retrying cannot fix (unknown tool, unusable arguments)"""
+
 
 class WorkflowStatus(Enum):
     """Status of the workflow execution"""
@@ -33,10 +363,26 @@ class Checkpoint:
 
     def __init__(self, step_id: str, backup_dir: Optional[Path] = None):
         self.step_id = step_id
-        self.timestamp = datetime.now()
+        self.timestamp_ns = time.time_ns()
         self.backup_dir = backup_dir
         self.state_snapshot: Dict[str, Any] = {}
 
+        # In-memory backup of a small file (kept out of state_snapshot so it
+        # is never serialized) and the stat to restore its metadata from
+        self.content: Optional[bytearray] = None
+        self.file_stat: Optional[os.stat_result] = None
+
+        # Once the step has written the file, content may be swapped for a
+        # compressed reverse delta plus digests of the before/after bytes
+        self.reverse_delta: Optional[bytes] = None
+        self.old_digest: Optional[bytes] = None
+        self.new_digest: Optional[bytes] = None
+
+    @property
+    def timestamp(self) -> datetime:
+        """When the checkpoint was taken"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "step_id": self.step_id,
@@ -51,7 +397,7 @@ class WorkflowEngine:
     Executes workflow plans with progress tracking and error handling.
 
     Features:
-    - Sequential execution with dependency resolution
+    - Parallel execution of independent steps with dependency resolution
     - Checkpointing before risky operations
     - Rollback on failure
     - Progress callbacks
@@ -64,7 +410,12 @@ class WorkflowEngine:
         tool_executor: ToolExecutor,
         agent_manager: Optional[Any] = None,
         checkpoint_dir: Optional[Path] = None,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        max_parallel_steps: int = 1,
+        strict_durability: bool = False,
+        log_sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+        snap_every: int = 1,
+        progress_callback_batch: Optional[Callable[[List[Tuple[str, str, str]]], None]] = None
     ):
         """
         Initialize the workflow engine.
@@ -75,12 +426,29 @@ class WorkflowEngine:
             checkpoint_dir: Directory for storing checkpoints/backups
             progress_callback: Function called on progress updates
                              Signature: callback(step_id, status, message)
+            max_parallel_steps: Maximum number of independent steps run at once
+                              (default 1: strictly sequential, since plans
+                              often omit dependencies between ordered steps)
+            strict_durability: fsync each on-disk backup as it is taken instead
+                             of once for the whole run
+            log_sink: Optional function receiving every log entry (e.g. a JSONL
+                     appender) for durable capture beyond the in-memory log
+            snap_every: Keep only every Nth log entry in memory (all entries
+                       still go to log_sink)
+            progress_callback_batch: Alternative to progress_callback that
+                                   receives a list of (step_id, status, message)
+                                   per flush; used in preference when given
         """
         self.tool_executor = tool_executor
         self.agent_manager = agent_manager
         self.checkpoint_dir = checkpoint_dir or Path("./workflow_checkpoints")
         self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
         self.progress_callback = progress_callback
+        self.progress_callback_batch = progress_callback_batch
+        self.max_parallel_steps = max(1, max_parallel_steps)
+        self.log_sink = log_sink
+        self.snap_every = max(1, snap_every)
+        self.strict_durability = strict_durability
 
         self.logger = logging.getLogger('WorkflowEngine')
 
@@ -88,38 +456,131 @@ class WorkflowEngine:
         self.current_plan: Optional[Plan] = None
         self.status = WorkflowStatus.PENDING
         self.checkpoints: List[Checkpoint] = []
-        self.execution_log: List[Dict[str, Any]] = []
+        self.execution_log: deque = deque(maxlen=EXEC_LOG_MAX)
+        self._log_events = 0
+
+        # Progress events not yet delivered, and the timer that will flush them
+        self._pending_events: List[Tuple[str, str, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
 
         # Control flags
         self.pause_requested = False
         self.cancel_requested = False
 
+        # On-disk backups for the current run (created on first use) and
+        # backup files whose fsync is deferred to the end of the run
+        self._run_dir: Optional[Path] = None
+        self._run_dir_lock = threading.Lock()
+        self._backup_seq = itertools.count(1)
+        self._pending_fsync: List[Path] = []
+        self._pending_dirs: set = set()
+
+        # Serializes backup + write for steps that target the same file
+        self._path_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        # Tool name -> binder(args) returning a runner with the arguments
+        # already parsed; runner() gives (success, result, error_message)
+        self._tool_dispatch: Dict[str, Callable[[Dict[str, Any]], Callable[..., Awaitable[Tuple[bool, Any, str]]]]] = {
+            "execute_bash": lambda args: functools.partial(
+                self._run_bash, args.get("command", "")),
+            "execute_python_script": lambda args: functools.partial(
+                self._run_python, args.get("code", "")),
+            "read_file_tool": lambda args: functools.partial(
+                self._run_read, _as_path(args.get("path", ""))),
+            "write_file_tool": lambda args: functools.partial(
+                self._run_write, _as_path(args.get("path", "")), args.get("content", "")),
+            "list_files_tool": lambda args: functools.partial(
+                self._run_list, _as_path(args.get("path", ".")), args.get("pattern", "*")),
+        }
+
+        # step_id -> precompiled runner for the plan being executed
+        self._step_runners: Dict[str, Callable[..., Awaitable[Tuple[bool, Any, str]]]] = {}
+
+        # Dependency graph of the last plan run, keyed on (weak reference to
+        # the Plan object, steps version); plan_id alone is not unique, since
+        # it survives Plan.from_dict and can be set freely
+        self._graph_key: Optional[Tuple[weakref.ref, int]] = None
+        self._graph: Optional[Tuple[List[PlanStep], Dict[str, int], Dict[str, List[str]]]] = None
+
         # Statistics
         self.steps_completed = 0
         self.steps_failed = 0
         self.total_execution_time = 0.0
+        self._reset_clock()
+
+    def _reset_clock(self):
+        """Anchor log and step timestamps: one wall-clock reading per workflow run"""
+        self._t0_ns = time.monotonic_ns()
+        self._t0_wall_ns = time.time_ns()
+
+    def _log_entry_view(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Log entry with its monotonic offset turned into an ISO timestamp"""
+        if "t_ns" not in entry:
+            return entry  # loaded from a saved state, already formatted
+        view = {"timestamp": datetime.fromtimestamp((self._t0_wall_ns + entry["t_ns"]) / 1e9).isoformat()}
+        view.update((k, v) for k, v in entry.items() if k != "t_ns")
+        return view
 
     def _report_progress(self, step_id: str, status: str, message: str):
-        """Report progress via callback"""
-        if self.progress_callback:
+        """Report progress via callback (queued; see flush_progress)"""
+        if self.progress_callback or self.progress_callback_batch:
+            self._pending_events.append((step_id, status, message))
+            if self._flush_handle is None:
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    self.flush_progress()  # no loop to defer to
+                else:
+                    self._flush_handle = loop.call_later(PROGRESS_FLUSH_INTERVAL, self.flush_progress)
+
+        # Log progress (t_ns is a monotonic offset; see _log_entry_view)
+        entry = {
+            "t_ns": time.monotonic_ns() - self._t0_ns,
+            "step_id": step_id,
+            "status": status,
+            "message": message
+        }
+
+        if self._log_events % self.snap_every == 0:
+            self.execution_log.append(entry)  # oldest entries fall off the ring
+        self._log_events += 1
+
+        if self.log_sink:
             try:
-                self.progress_callback(step_id, status, message)
+                self.log_sink(self._log_entry_view(entry))
+            except Exception as e:
+                self.logger.error(f"Error in log sink: {e}")
+
+    def flush_progress(self):
+        """Deliver all queued progress events to the callback now"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        events, self._pending_events = self._pending_events, []
+        if not events:
+            return
+
+        if self.progress_callback_batch:
+            try:
+                self.progress_callback_batch(events)
             except Exception as e:
                 self.logger.error(f"Error in progress callback: {e}")
+            return
 
-        # Log progress
-        self.execution_log.append({
-            "timestamp": datetime.now().isoformat(),
-            "step_id": step_id,
-            "status": status,
-            "message": message
-        })
+        callback = self.progress_callback
+        for event in events:
+            try:
+                callback(*event)
+            except Exception as e:
+                self.logger.error(f"Error in progress callback: {e}")
 
     def _create_checkpoint(self, step: PlanStep) -> Checkpoint:
         """
         Create a checkpoint before executing a step.
 
         For file operations, backs up files that might be modified.
+        Blocking; safe to run on a worker thread.
         """
         self.logger.info(f"Creating checkpoint for step {step.step_id}")
 
@@ -129,24 +590,175 @@ class WorkflowEngine:
         if step.tool == "write_file_tool" and step.arguments.get("path"):
             file_path = Path(step.arguments["path"])
 
-            if file_path.exists():
-                # Create backup directory for this checkpoint
-                backup_dir = self.checkpoint_dir / f"checkpoint_{step.step_id}_{int(datetime.now().timestamp())}"
-                backup_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                st = file_path.stat()
+            except FileNotFoundError:
+                st = None
 
-                # Backup the file
-                backup_path = backup_dir / file_path.name
-                shutil.copy2(file_path, backup_path)
+            new_content = step.arguments.get("content")
+            new_bytes = new_content.encode('utf-8') if isinstance(new_content, str) else None
+            maybe_noop = new_bytes is not None and st is not None and len(new_bytes) == st.st_size
+            git_ref = None
 
-                checkpoint.backup_dir = backup_dir
+            if st is not None:
                 checkpoint.state_snapshot["original_path"] = str(file_path)
+
+            if st is not None and st.st_size <= CHECKPOINT_INMEM_THRESHOLD:
+                # Small file: keep the bytes on the checkpoint, no directory or copy
+                content = _read_into(file_path, st.st_size)
+
+                if maybe_noop and content == new_bytes:
+                    checkpoint.state_snapshot["noop"] = True
+                    self.logger.info(f"Skipping backup of {file_path}: write is a no-op")
+                else:
+                    checkpoint.content = content
+                    checkpoint.file_stat = st
+                    checkpoint.state_snapshot["in_memory_bytes"] = len(content)
+                    self.logger.info(f"Buffered {len(content)} bytes of {file_path} in memory")
+
+            elif maybe_noop and _file_equals(file_path, new_bytes):
+                checkpoint.state_snapshot["noop"] = True
+                self.logger.info(f"Skipping backup of {file_path}: write is a no-op")
+
+            elif st is not None and (git_ref := _git_clean_head(file_path)):
+                # Tracked and unmodified in git: HEAD already holds these bytes
+                checkpoint.state_snapshot["git_ref"] = git_ref
+                self.logger.info(f"Skipping backup of {file_path}: clean in git at {git_ref[:12]}")
+
+            elif st is not None:
+                # Store the bytes once in the content-addressed object store,
+                # then give this run a hard link to them under a sequential name
+                object_path, ingested = self._ingest_object(file_path)
+                backup_dir = self._get_run_dir()
+                backup_path = backup_dir / f"{next(self._backup_seq):04d}_{file_path.name}"
+                try:
+                    os.link(object_path, backup_path)
+                except OSError:
+                    _fast_copy(object_path, backup_path)  # no hard links here
+                    ingested = True
+                self._sync_backup(backup_path if ingested else None, backup_dir)
+
+                checkpoint.backup_dir = backup_dir
+                checkpoint.file_stat = st
                 checkpoint.state_snapshot["backup_path"] = str(backup_path)
+                checkpoint.state_snapshot["content_hash"] = object_path.parent.name + object_path.name
 
                 self.logger.info(f"Created backup at {backup_path}")
 
         self.checkpoints.append(checkpoint)
         return checkpoint
 
+    def _compact_checkpoint(self, checkpoint: Checkpoint):
+        """
+        After a write, replace an in-memory backup with a reverse delta
+        against the file's new contents when that is smaller.
+        """
+        try:
+            original_path = Path(checkpoint.state_snapshot["original_path"])
+            new = original_path.read_bytes()
+            old = bytes(checkpoint.content)
+            delta = _make_reverse_delta(old, new)
+        except Exception as e:
+            self.logger.warning(f"Keeping full backup for step {checkpoint.step_id}: {e}")
+            return
+
+        if len(delta) < len(old):
+            checkpoint.reverse_delta = delta
+            checkpoint.old_digest = _digest(old)
+            checkpoint.new_digest = _digest(new)
+            checkpoint.content = None
+            checkpoint.state_snapshot["reverse_delta_bytes"] = len(delta)
+
+    def _get_run_dir(self) -> Path:
+        """Get this run's backup directory, creating it on first use"""
+        with self._run_dir_lock:  # checkpoints are taken on worker threads
+            if self._run_dir is None:
+                run_dir = self.checkpoint_dir / f"run_{uuid.uuid4().hex[:12]}"
+                run_dir.mkdir(parents=True, exist_ok=True)
+                self._run_dir = run_dir
+            return self._run_dir
+
+    def _ingest_object(self, file_path: Path) -> Tuple[Path, bool]:
+        """
+        Add a file's contents to checkpoint_dir/objects, keyed by blake2b.
+
+        The source is hashed first, so content already in the store costs a
+        read but no copy. A new object is copied to a temp name and the copy
+        is hashed again, so the stored object always matches its name even
+        if the source changed in between. Identical content is only ever
+        stored once.
+
+        Returns:
+            Tuple of (object path, whether a new object was written)
+        """
+        objects_dir = self.checkpoint_dir / "objects"
+        objects_dir.mkdir(exist_ok=True)
+
+        digest = _hash_file(file_path)
+        object_path = objects_dir / digest[:2] / digest[2:]
+        if object_path.exists():
+            return (object_path, False)
+
+        tmp_path = objects_dir / f".ingest_{os.getpid()}_{threading.get_ident()}.tmp"
+        try:
+            _fast_copy(file_path, tmp_path)
+            copied_digest = _hash_file(tmp_path)
+            if copied_digest != digest:
+                # Source changed mid-copy: file what was actually copied
+                object_path = objects_dir / copied_digest[:2] / copied_digest[2:]
+                if object_path.exists():
+                    return (object_path, False)
+
+            object_path.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, object_path)
+            self._sync_backup(object_path, object_path.parent)
+            return (object_path, True)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _sync_backup(self, backup_path: Optional[Path], directory: Path):
+        """
+        fsync a new backup file and the directory entry pointing at it, now
+        (strict mode) or batched until _sync_checkpoints
+        """
+        if not self.strict_durability:
+            if backup_path is not None:
+                self._pending_fsync.append(backup_path)  # opened at sync time
+            self._pending_dirs.add(directory)
+            return
+
+        if backup_path is not None:
+            fd = os.open(backup_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        _fsync_dir(directory)
+
+    def _sync_checkpoints(self):
+        """
+        Group commit: flush all deferred backups and their directories once.
+        Blocking; run it through _run_checkpoint_io from async code.
+        """
+        pending, self._pending_fsync = self._pending_fsync, []
+        for backup_path in pending:
+            try:
+                fd = os.open(backup_path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                self.logger.error(f"Error syncing checkpoint backup: {e}")
+
+        dirs, self._pending_dirs = self._pending_dirs, set()
+        if dirs:
+            # Parents last, so new subdirectories are durable before they are linked
+            for directory in sorted(dirs, key=lambda d: len(d.parts), reverse=True):
+                _fsync_dir(directory)
+            _fsync_dir(self.checkpoint_dir)
+            _fsync_dir(self.checkpoint_dir / "objects")
+
     def _rollback_to_checkpoint(self, checkpoint: Checkpoint) -> bool:
         """
         Rollback to a specific checkpoint.
@@ -156,13 +768,44 @@ class WorkflowEngine:
         self.logger.info(f"Rolling back to checkpoint for step {checkpoint.step_id}")
 
         try:
+            if checkpoint.reverse_delta is not None:
+                original_path = Path(checkpoint.state_snapshot["original_path"])
+                current = original_path.read_bytes()
+                digest = _digest(current)
+
+                if digest == checkpoint.new_digest:
+                    restored = _apply_reverse_delta(current, checkpoint.reverse_delta)
+                    _write_replace(original_path, restored, checkpoint.file_stat)
+                    self.logger.info(f"Restored {original_path} from reverse delta")
+                elif digest != checkpoint.old_digest:
+                    raise ValueError(f"{original_path} changed after the step; reverse delta no longer applies")
+
+            elif "git_ref" in checkpoint.state_snapshot:
+                original_path = Path(checkpoint.state_snapshot["original_path"])
+                subprocess.run(
+                    ["git", "checkout", checkpoint.state_snapshot["git_ref"], "--", original_path.name],
+                    cwd=original_path.parent, check=True, capture_output=True, timeout=GIT_TIMEOUT
+                )
+                self.logger.info(f"Restored {original_path} from git")
+
+            elif checkpoint.content is not None:
+                original_path = Path(checkpoint.state_snapshot["original_path"])
+                _write_replace(original_path, checkpoint.content, checkpoint.file_stat)
+                self.logger.info(f"Restored {original_path} from memory")
+
             # Restore backed up files
-            if checkpoint.backup_dir and checkpoint.backup_dir.exists():
+            elif checkpoint.backup_dir and checkpoint.backup_dir.exists():
                 backup_path = Path(checkpoint.state_snapshot.get("backup_path", ""))
                 original_path = Path(checkpoint.state_snapshot.get("original_path", ""))
 
                 if backup_path.exists() and original_path:
-                    shutil.copy2(backup_path, original_path)
+                    _fast_copy(backup_path, original_path)
+                    if checkpoint.file_stat is not None:
+                        # The stored object is shared, so its metadata may be
+                        # another checkpoint's; put back this file's own
+                        os.chmod(original_path, checkpoint.file_stat.st_mode & 0o7777)
+                        os.utime(original_path, ns=(checkpoint.file_stat.st_atime_ns,
+                                                    checkpoint.file_stat.st_mtime_ns))
                     self.logger.info(f"Restored {original_path} from backup")
 
             return True
@@ -171,84 +814,157 @@ class WorkflowEngine:
             self.logger.error(f"Error during rollback: {e}")
             return False
 
-    def _rollback_all(self):
-        """Rollback all checkpoints in reverse order"""
+    async def _rollback_all(self) -> List[str]:
+        """
+        Rollback all checkpoints.
+
+        Checkpoints are grouped by file. Each group is undone newest-first
+        (so the oldest backup wins), and different files are restored
+        concurrently on worker threads. A file that fails to restore does
+        not stop the others.
+
+        Returns:
+            Paths of files that could not be restored (empty on success)
+        """
         self.logger.info(f"Rolling back {len(self.checkpoints)} checkpoints")
 
+        groups: Dict[str, List[Checkpoint]] = defaultdict(list)
         for checkpoint in reversed(self.checkpoints):
-            self._rollback_to_checkpoint(checkpoint)
-
-        self.status = WorkflowStatus.ROLLED_BACK
-        self._report_progress("workflow", "rolled_back", "All changes rolled back")
+            original_path = checkpoint.state_snapshot.get("original_path")
+            if original_path:
+                groups[original_path].append(checkpoint)
+
+        def restore_group(group: List[Checkpoint]) -> bool:
+            ok = True
+            for checkpoint in group:
+                ok = self._rollback_to_checkpoint(checkpoint) and ok
+            return ok
+
+        paths = list(groups)
+        outcomes = await asyncio.gather(
+            *(_run_checkpoint_io(restore_group, groups[path]) for path in paths),
+            return_exceptions=True
+        )
+        failed = [path for path, ok in zip(paths, outcomes) if ok is not True]
+
+        if failed:
+            self.status = WorkflowStatus.FAILED
+            self._report_progress("workflow", "rollback_failed",
+                                  f"Could not restore: {', '.join(failed)}")
+        else:
+            self.status = WorkflowStatus.ROLLED_BACK
+            self._report_progress("workflow", "rolled_back", "All changes rolled back")
+        self.flush_progress()
+        return failed
+
+    @staticmethod
+    def _rollback_note(failed: List[str]) -> str:
+        """Sentence for execute_plan's message about an automatic rollback"""
+        if failed:
+            return f"Rollback incomplete, could not restore: {', '.join(failed)}."
+        return "Changes rolled back."
+
+    def _compile_step(self, step: PlanStep) -> Optional[Callable[..., Awaitable[Tuple[bool, Any, str]]]]:
+        """
+        Bind a step's tool handler to its parsed arguments, or None if the
+        step's tool is unknown.
+        """
+        binder = self._tool_dispatch.get(step.tool)
+        if binder is None:
+            return None
+        return binder(step.arguments or {})
 
-    async def _execute_tool(self, step: PlanStep) -> Tuple[bool, Any, str]:
+    async def _execute_tool(
+        self,
+        step: PlanStep,
+        barrier: Optional[Awaitable[Any]] = None
+    ) -> Tuple[bool, Any, str]:
         """
         Execute a tool for a step.
 
+        Args:
+            step: The step whose tool to run
+            barrier: For write_file_tool, awaited before the file is written
+
         Returns:
             Tuple of (success, result, error_message)
+
+        Raises:
+            NonRetryableStepError: If the tool is unknown or the step's
+                                   arguments cannot be bound to it
         """
         if not step.tool:
             return (True, None, "")
 
         tool_name = step.tool
-        args = step.arguments or {}
+        self.logger.info("Executing tool: %s with args: %s", tool_name, step.arguments)
 
-        self.logger.info(f"Executing tool: {tool_name} with args: {args}")
+        # Runners are compiled once per plan run in execute_plan
+        runner = self._step_runners.get(step.step_id)
+        if runner is None:
+            try:
+                runner = self._compile_step(step)
+            except Exception as e:
+                raise NonRetryableStepError(f"Invalid arguments for {tool_name}: {e}") from e
+            if runner is None:
+                raise NonRetryableStepError(f"Unknown tool: {tool_name}")
 
         try:
-            if tool_name == "execute_bash":
-                command = args.get("command", "")
-                result = await self.tool_executor.execute_bash(command)
-                return (result.success, result.stdout, result.stderr or result.error_message or "")
-
-            elif tool_name == "execute_python_script":
-                code = args.get("code", "")
-                result = await self.tool_executor.execute_python_script(code)
-                return (result.success, result.stdout, result.stderr or result.error_message or "")
-
-            elif tool_name == "read_file_tool":
-                path = args.get("path", "")
-                result = await self.tool_executor.read_file(Path(path) if isinstance(path, str) else path)
-                return (result.success, result.stdout, result.error_message or "")
-
-            elif tool_name == "write_file_tool":
-                path = args.get("path", "")
-                content = args.get("content", "")
-                result = await self.tool_executor.write_file(
-                    Path(path) if isinstance(path, str) else path,
-                    content
-                )
-                return (result.success, result.stdout, result.error_message or "")
-
-            elif tool_name == "list_files_tool":
-                path = args.get("path", ".")
-                pattern = args.get("pattern", "*")
-                result = await self.tool_executor.list_files(
-                    Path(path) if isinstance(path, str) else path,
-                    pattern
-                )
-                return (result.success, result.stdout, result.error_message or "")
-
-            else:
-                return (False, None, f"Unknown tool: {tool_name}")
+            if barrier is not None:
+                return await runner(barrier)
+            return await runner()
 
         except Exception as e:
             self.logger.error(f"Error executing tool {tool_name}: {e}")
             return (False, None, str(e))
 
+    async def _run_bash(self, command: str) -> Tuple[bool, Any, str]:
+        """Handler for execute_bash"""
+        result = await self.tool_executor.execute_bash(command)
+        return (result.success, result.stdout, self._failure_text(result))
+
+    async def _run_python(self, code: str) -> Tuple[bool, Any, str]:
+        """Handler for execute_python_script"""
+        result = await self.tool_executor.execute_python_script(code)
+        return (result.success, result.stdout, self._failure_text(result))
+
+    async def _run_read(self, path: Path) -> Tuple[bool, Any, str]:
+        """Handler for read_file_tool"""
+        result = await self.tool_executor.read_file(path)
+        return (result.success, result.stdout, result.error_message or "")
+
+    async def _run_write(
+        self,
+        path: Path,
+        content: str,
+        barrier: Optional[Awaitable[Any]] = None
+    ) -> Tuple[bool, Any, str]:
+        """Handler for write_file_tool"""
+        result = await self.tool_executor.write_file(path, content, barrier=barrier)
+        return (result.success, result.stdout, result.error_message or "")
+
+    async def _run_list(self, path: Path, pattern: str) -> Tuple[bool, Any, str]:
+        """Handler for list_files_tool"""
+        result = await self.tool_executor.list_files(path, pattern)
+        return (result.success, result.stdout, result.error_message or "")
+
+    @staticmethod
+    def _failure_text(result) -> str:
+        """Error text for a subprocess result; stderr is only decoded on failure"""
+        if result.success:
+            return ""
+        return result.stderr or result.error_message or ""
+
     async def _execute_step(
         self,
         step: PlanStep,
-        retry_count: int = 0,
         max_retries: int = 2
     ) -> bool:
         """
-        Execute a single step.
+        Execute a single step, retrying failed attempts with backoff.
 
         Args:
             step: The step to execute
-            retry_count: Current retry attempt
             max_retries: Maximum number of retries
 
         Returns:
@@ -258,33 +974,73 @@ class WorkflowEngine:
 
         # Update step status
         step.status = StepStatus.IN_PROGRESS
-        step.start_time = datetime.now()
+        step.mark_started(self._t0_wall_ns - self._t0_ns)  # same anchor as the log
         self._report_progress(step.step_id, "in_progress", step.description)
 
         try:
-            # Create checkpoint before risky operations
+            # Create checkpoint before risky operations (once; retries share it)
+            checkpoint_task = None
+            barrier = None
+            path_lock = None
             if step.tool in ["write_file_tool", "execute_bash"]:
-                self._create_checkpoint(step)
-
-            # Execute the tool
-            if step.tool:
-                success, result, error = await self._execute_tool(step)
-
-                if not success:
-                    raise Exception(error or "Tool execution failed")
+                if step.tool == "write_file_tool" and step.arguments.get("path"):
+                    # Steps writing the same file must not interleave backup and write
+                    path_lock = self._path_locks[os.path.abspath(str(step.arguments["path"]))]
+                    await path_lock.acquire()
+
+                # The backup overlaps tool startup; writes wait on it before
+                # opening the file, bash only needs it done by the end of the step
+                checkpoint_task = asyncio.ensure_future(
+                    _run_checkpoint_io(self._create_checkpoint, step)
+                )
+                if step.tool == "write_file_tool":
+                    barrier = checkpoint_task
 
-                step.result = result
-            else:
-                # No tool specified - this might be a manual step or agent task
-                # For now, we'll mark it as successful
-                step.result = "Completed (no tool specified)"
+            try:
+                for attempt in range(max_retries + 1):
+                    try:
+                        # Execute the tool
+                        if step.tool:
+                            success, result, error = await self._execute_tool(step, barrier)
+
+                            if not success:
+                                raise Exception(error or "Tool execution failed")
+                        else:
+                            # No tool specified - this might be a manual step or agent task
+                            # For now, we'll mark it as successful
+                            result = "Completed (no tool specified)"
+                        break
+
+                    except Exception as e:
+                        if attempt == max_retries or isinstance(e, NonRetryableStepError):
+                            raise
+
+                        self.logger.error(f"Error executing step {step.step_id}: {e}")
+                        self.logger.info(f"Retrying step {step.step_id} (attempt {attempt + 1}/{max_retries})")
+                        await asyncio.sleep(0.1 * 2 ** attempt)  # Exponential backoff
+
+                if checkpoint_task is not None:
+                    checkpoint = await checkpoint_task
+                    if checkpoint.content is not None:
+                        # Still under the path lock, so the delta is against our write
+                        await _run_checkpoint_io(self._compact_checkpoint, checkpoint)
+
+            finally:
+                try:
+                    # Rollback needs the checkpoint even if the tool failed early
+                    if checkpoint_task is not None:
+                        await checkpoint_task
+                finally:
+                    if path_lock is not None:
+                        path_lock.release()
+
+            step.result = result
 
             # Mark as completed
             step.status = StepStatus.COMPLETED
-            step.end_time = datetime.now()
+            execution_time = step.mark_finished()
             self.steps_completed += 1
 
-            execution_time = (step.end_time - step.start_time).total_seconds()
             self.total_execution_time += execution_time
 
             self._report_progress(
@@ -298,16 +1054,9 @@ class WorkflowEngine:
         except Exception as e:
             self.logger.error(f"Error executing step {step.step_id}: {e}")
 
-            # Retry logic
-            if retry_count < max_retries:
-                self.logger.info(f"Retrying step {step.step_id} (attempt {retry_count + 1}/{max_retries})")
-                step.status = StepStatus.PENDING
-                await asyncio.sleep(1)  # Brief delay before retry
-                return await self._execute_step(step, retry_count + 1, max_retries)
-
             # Max retries exceeded
             step.status = StepStatus.FAILED
-            step.end_time = datetime.now()
+            step.mark_finished()
             step.error = str(e)
             self.steps_failed += 1
 
@@ -348,42 +1097,52 @@ class WorkflowEngine:
         # Initialize execution
         self.current_plan = plan
         self.status = WorkflowStatus.RUNNING
-        self.checkpoints = []
-        self.execution_log = []
+        # Reuse the containers rather than reallocating them every run
+        self.checkpoints.clear()
+        self.execution_log.clear()
+        self._log_events = 0
         self.steps_completed = 0
         self.steps_failed = 0
         self.total_execution_time = 0.0
+        self._reset_clock()
+        self._run_dir = None
+        self._backup_seq = itertools.count(1)
+
+        # Resolve each step's handler and arguments once, not on every attempt
+        self._step_runners = {}
+        for step in plan.steps:
+            if not step.tool:
+                continue
+            try:
+                runner = self._compile_step(step)
+            except Exception:
+                continue  # bad arguments: let the step itself fail and report it
+            if runner is not None:
+                self._step_runners[step.step_id] = runner
 
         self._report_progress("workflow", "started", f"Executing plan: {plan.name}")
 
         try:
-            # Get execution order (respects dependencies)
-            steps_ordered = plan.get_execution_order()
-
-            # Execute steps in order
-            for step in steps_ordered:
-                # Check for pause/cancel
-                if self.pause_requested:
-                    self.status = WorkflowStatus.PAUSED
-                    return (False, "Execution paused by user")
+            outcome, failed_step = await self._run_steps(plan, stop_on_error)
 
-                if self.cancel_requested:
-                    if auto_rollback:
-                        self._rollback_all()
-                    return (False, "Execution canceled by user")
+            if outcome == "paused":
+                self.status = WorkflowStatus.PAUSED
+                return (False, "Execution paused by user")
 
-                # Execute the step
-                success = await self._execute_step(step)
+            if outcome == "canceled":
+                if auto_rollback:
+                    await self._rollback_all()
+                return (False, "Execution canceled by user")
 
-                if not success and stop_on_error:
-                    self.logger.error(f"Step {step.step_id} failed, stopping execution")
+            if outcome == "failed":
+                self.logger.error(f"Step {failed_step.step_id} failed, stopping execution")
 
-                    if auto_rollback:
-                        self._rollback_all()
-                        return (False, f"Step failed: {step.description}. Changes rolled back.")
+                if auto_rollback:
+                    failed = await self._rollback_all()
+                    return (False, f"Step failed: {failed_step.description}. {self._rollback_note(failed)}")
 
-                    self.status = WorkflowStatus.FAILED
-                    return (False, f"Step failed: {step.description}")
+                self.status = WorkflowStatus.FAILED
+                return (False, f"Step failed: {failed_step.description}")
 
             # All steps completed
             self.status = WorkflowStatus.COMPLETED
@@ -397,11 +1156,99 @@ class WorkflowEngine:
             self.status = WorkflowStatus.FAILED
 
             if auto_rollback:
-                self._rollback_all()
-                return (False, f"Execution failed: {e}. Changes rolled back.")
+                failed = await self._rollback_all()
+                return (False, f"Execution failed: {e}. {self._rollback_note(failed)}")
 
             return (False, f"Execution failed: {e}")
 
+        finally:
+            await _run_checkpoint_io(self._sync_checkpoints)
+            self.flush_progress()
+
+    def _get_graph(
+        self,
+        plan: Plan
+    ) -> Tuple[List[PlanStep], Dict[str, int], Dict[str, List[str]]]:
+        """
+        Get (execution order, in-degree per step, dependents per step) for a
+        plan, reusing the last result while the plan's steps are unchanged.
+        """
+        key = self._graph_key
+        if key is None or key[0]() is not plan or key[1] != plan._steps_version:
+            order = plan.get_execution_order()
+            indegree = {step.step_id: len(step.dependencies) for step in order}
+            children: Dict[str, List[str]] = defaultdict(list)
+            for step in order:
+                for dep in step.dependencies:
+                    children[dep].append(step.step_id)
+
+            self._graph = (order, indegree, dict(children))
+            self._graph_key = (weakref.ref(plan), plan._steps_version)
+
+        return self._graph
+
+    async def _run_steps(
+        self,
+        plan: Plan,
+        stop_on_error: bool
+    ) -> Tuple[str, Optional[PlanStep]]:
+        """
+        Run the plan's steps as a DAG, starting each step as soon as its
+        dependencies have finished (up to max_parallel_steps at a time).
+
+        On pause, cancel or a failure with stop_on_error, no new steps are
+        started and the ones already running are allowed to finish.
+
+        Returns:
+            Tuple of (outcome, failed_step) where outcome is "completed",
+            "paused", "canceled" or "failed"
+        """
+        order, indegree, children = self._get_graph(plan)
+        steps = {step.step_id: step for step in order}
+        waiting_on = dict(indegree)
+
+        # Start from roots in execution order so ties start in the same order
+        # the sequential engine used (validate() has already ruled out cycles)
+        ready: deque = deque(step.step_id for step in order if not waiting_on[step.step_id])
+        running: Dict[asyncio.Task, PlanStep] = {}
+        outcome = "completed"
+        failed_step = None
+
+        try:
+            while True:
+                if outcome == "completed":
+                    if self.pause_requested:
+                        outcome = "paused"
+                    elif self.cancel_requested:
+                        outcome = "canceled"
+                    else:
+                        while ready and len(running) < self.max_parallel_steps:
+                            step = steps[ready.popleft()]
+                            running[asyncio.create_task(self._execute_step(step))] = step
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = running.pop(task)
+                    if task.result() or not stop_on_error:
+                        # Without stop_on_error, dependents still run after a failure
+                        for child_id in children.get(step.step_id, ()):
+                            waiting_on[child_id] -= 1
+                            if not waiting_on[child_id]:
+                                ready.append(child_id)
+                    elif failed_step is None:
+                        outcome, failed_step = "failed", step
+        finally:
+            # Only reached with tasks left if something raised; don't orphan them
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return (outcome, failed_step)
+
     def pause(self):
         """Request to pause execution"""
         self.pause_requested = True
@@ -415,6 +1262,8 @@ class WorkflowEngine:
     def cancel(self):
         """Request to cancel execution"""
         self.cancel_requested = True
+        self._graph_key = None
+        self._graph = None
         self.logger.info("Cancel requested")
 
     def get_execution_summary(self) -> Dict[str, Any]:
@@ -437,11 +1286,27 @@ class WorkflowEngine:
         }
 
     def get_execution_log(self) -> List[Dict[str, Any]]:
-        """Get the execution log"""
-        return self.execution_log.copy()
+        """Get the execution log (timestamps are formatted here, not when logged)"""
+        return list(self.iter_execution_log())
+
+    def iter_execution_log(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the execution log without building a list.
+
+        Entries are formatted one at a time as they are consumed. The log
+        must not be appended to while iterating (i.e. between awaits of a
+        running plan), as with any deque.
+        """
+        return map(self._log_entry_view, self.execution_log)
 
-    def save_state(self, file_path: Path):
-        """Save the current workflow state to a file"""
+    def save_state(self, file_path: Path, pretty: bool = False):
+        """
+        Save the current workflow state to a file
+
+        Args:
+            file_path: Destination path (replaced atomically)
+            pretty: Indent the JSON for human reading
+        """
         if not self.current_plan:
             raise ValueError("No plan to save")
 
@@ -449,23 +1314,24 @@ class WorkflowEngine:
             "plan": self.current_plan.to_dict(),
             "status": self.status.value,
             "summary": self.get_execution_summary(),
-            "log": self.execution_log
+            "log": self.get_execution_log()
         }
 
-        with open(file_path, 'w') as f:
-            json.dump(state, f, indent=2)
+        data = fast_json.dumps_bytes(state, indent=2 if pretty else None)
+        _write_replace(Path(file_path), data, durable=True)
 
         self.logger.info(f"Workflow state saved to {file_path}")
 
     @classmethod
     def load_state(cls, file_path: Path, tool_executor: ToolExecutor) -> 'WorkflowEngine':
-        """Load a workflow state from a file"""
-        with open(file_path, 'r') as f:
-            state = json.load(f)
+        """Load a workflow state from a file (parsed states are cached by mtime)"""
+        st = os.stat(file_path)
+        state = _read_state(str(file_path), st.st_mtime_ns, st.st_size)
 
+        # state is a private copy; nothing built from it is shared with the cache
         engine = cls(tool_executor)
         engine.current_plan = Plan.from_dict(state["plan"])
         engine.status = WorkflowStatus(state["status"])
-        engine.execution_log = state.get("log", [])
+        engine.execution_log = deque(state.get("log", []), maxlen=EXEC_LOG_MAX)
 
         return engine